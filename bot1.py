@@ -2,12 +2,30 @@ from pkbot.actions import ActionFold, ActionCall, ActionCheck, ActionRaise, Acti
 from pkbot.states import GameInfo, PokerState
 from pkbot.base import BaseBot
 from pkbot.runner import parse_args, run_bot
+from pkbot.params import load_params, params_path
 
 import random
 import itertools
 
+# tunable constants; tune.py writes better values to bot1.params.json
+PARAMS = {
+    'auction_simulations': 150,
+    'simulations': 200,
+    'auction_low': 40,           # win % band where seeing a card is worth the most
+    'auction_high': 70,
+    'auction_bid': 0.15,         # fraction of chips bid inside the band
+    'auction_small_bid': 0.02,   # and outside it
+    'revealed_raise': 60,        # win % to raise when we know a card
+    'revealed_fold': 20,         # below this we give up when we know a card
+    'raise_threshold': 70,       # win % to raise otherwise
+    'fold_threshold': 40,        # below this we fold to a bet otherwise
+    'raise_multiple': 2.,        # raise size as a multiple of the minimum raise
+    'max_raises': 2,             # raises per hand
+}
+
 class Player(BaseBot):
-    def __init__(self) -> None:
+    def __init__(self, params=None) -> None:
+        self.params = params if params is not None else load_params(PARAMS, params_path(__file__))
         self.RANKS = "23456789TJQKA"
         self.SUITS = "shdc"
         self.my_raise_count = 0
@@ -98,6 +116,7 @@ class Player(BaseBot):
     # -------------------------
     def get_move(self, game_info: GameInfo, current_state: PokerState) -> ActionFold | ActionCall | ActionCheck | ActionRaise | ActionBid:
        
+        params = self.params
         my_cards = current_state.my_hand
         board = getattr(current_state, 'board', [])
         street = current_state.street
@@ -106,23 +125,23 @@ class Player(BaseBot):
         # AUCTION PHASE
         # ==========================================================
         if street == 'auction':
-            win_pct = self.monte_carlo_win_pct(my_cards, board, simulations=150)
+            win_pct = self.monte_carlo_win_pct(my_cards, board, simulations=params['auction_simulations'])
             chips = current_state.my_chips
            
             # Sane bidding logic: High uncertainty (40-70%) = High Value of Info
-            if 40 <= win_pct <= 70:
-                bid_amount = int(0.15 * chips) # Bid 15% to clear up uncertainty
+            if params['auction_low'] <= win_pct <= params['auction_high']:
+                bid_amount = int(params['auction_bid'] * chips) # Bid 15% to clear up uncertainty
             else:
-                bid_amount = int(0.02 * chips) # Bid tiny amount if we are already winning/losing
+                bid_amount = int(params['auction_small_bid'] * chips) # Bid tiny amount if we are already winning/losing
                
             return ActionBid(min(bid_amount, chips))
 
         # Determine win percentages for betting
         opp_revealed = current_state.opp_revealed_cards
         if opp_revealed:
-            win_pct = self.monte_carlo_win_pct(my_cards, board, opp_known_card=opp_revealed[0], simulations=200)
+            win_pct = self.monte_carlo_win_pct(my_cards, board, opp_known_card=opp_revealed[0], simulations=params['simulations'])
         else:
-            win_pct = self.monte_carlo_win_pct(my_cards, board, simulations=200)
+            win_pct = self.monte_carlo_win_pct(my_cards, board, simulations=params['simulations'])
 
         # Helper function for safe raises
         can_raise = current_state.can_act(ActionRaise)
@@ -130,7 +149,7 @@ class Player(BaseBot):
        
         def safe_raise():
             self.my_raise_count += 1
-            target_raise = min(2 * min_r, max_r)
+            target_raise = min(int(params['raise_multiple'] * min_r), max_r)
             return ActionRaise(max(min_r, target_raise))
 
         # ==========================================================
@@ -138,14 +157,14 @@ class Player(BaseBot):
         # ==========================================================
         if opp_revealed:
             # > 60 → Raise (preferably 2x min raise), else call
-            if win_pct > 60:
-                if self.my_raise_count < 2 and can_raise:
+            if win_pct > params['revealed_raise']:
+                if self.my_raise_count < params['max_raises'] and can_raise:
                     return safe_raise()
                 if current_state.can_act(ActionCall): return ActionCall()
                 if current_state.can_act(ActionCheck): return ActionCheck()
 
             # 20–60 → Call
-            elif 20 <= win_pct <= 60:
+            elif params['revealed_fold'] <= win_pct <= params['revealed_raise']:
                 if current_state.can_act(ActionCall): return ActionCall()
                 if current_state.can_act(ActionCheck): return ActionCheck()
 
@@ -161,13 +180,13 @@ class Player(BaseBot):
             opponent_raised = current_state.cost_to_call > 0
 
             # If < 40 and opponent raised → Fold
-            if win_pct < 40 and opponent_raised:
+            if win_pct < params['fold_threshold'] and opponent_raised:
                 if current_state.can_act(ActionFold): return ActionFold()
                 if current_state.can_act(ActionCheck): return ActionCheck()
 
             # If > 70 → Raise
-            if win_pct > 70:
-                if self.my_raise_count < 2 and can_raise:
+            if win_pct > params['raise_threshold']:
+                if self.my_raise_count < params['max_raises'] and can_raise:
                     return safe_raise()
                 if current_state.can_act(ActionCall): return ActionCall()
                 if current_state.can_act(ActionCheck): return ActionCheck()
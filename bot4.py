@@ -3,15 +3,41 @@ from pkbot.actions import ActionFold, ActionCall, ActionCheck, ActionRaise, Acti
 from pkbot.states import GameInfo, PokerState
 from pkbot.base import BaseBot
 from pkbot.runner import parse_args, run_bot
+from pkbot.params import load_params, params_path
+
+# tunable constants; tune.py writes better values to bot4.params.json
+PARAMS = {
+    'draw_bid': 0.30,            # auction bids as fractions of our chips
+    'value_bid': 0.18,
+    'base_bid': 0.05,
+    'preflop_raise': 1.5,        # pressure_raise pot multipliers
+    'overpair_wet_raise': 1.6,
+    'overpair_raise': 1.2,
+    'top_pair_raise': 1.0,
+    'semi_bluff_raise': 1.1,
+    'bluff_raise': 0.8,
+    'preflop_call': 0.25,        # calls allowed up to this fraction of the pot
+    'mid_pair_call': 0.4,
+    'draw_call': 0.45,
+    'semi_bluff_freq': 0.65,     # random raise frequencies
+    'bluff_freq': 0.35,
+}
 
 
 class Player(BaseBot):
 
-    def __init__(self):
+    def __init__(self, params=None):
+        self.params = params if params is not None else load_params(PARAMS, params_path(__file__))
         self.rank_values = {'2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7,
                             '8': 8, '9': 9, 'T': 10, 'J': 11,
                             'Q': 12, 'K': 13, 'A': 14}
 
+    def on_hand_start(self, game_info: GameInfo, current_state: PokerState) -> None:
+        pass
+
+    def on_hand_end(self, game_info: GameInfo, current_state: PokerState) -> None:
+        pass
+
     # -------------------------------------------------------
     # BOARD TEXTURE
     # -------------------------------------------------------
@@ -98,6 +124,7 @@ class Player(BaseBot):
 
     def get_move(self, game_info: GameInfo, state: PokerState):
 
+        params = self.params
         my_cards = state.my_hand
         board = getattr(state, "board", [])
         street = state.street
@@ -117,11 +144,11 @@ class Player(BaseBot):
             chips = state.my_chips
 
             if draw or texture == "wet":
-                bid = int(chips * 0.30)
+                bid = int(chips * params['draw_bid'])
             elif hand_type in ["overpair", "top_pair"]:
-                bid = int(chips * 0.18)
+                bid = int(chips * params['value_bid'])
             else:
-                bid = int(chips * 0.05)
+                bid = int(chips * params['base_bid'])
 
             return ActionBid(min(bid, chips))
 
@@ -136,10 +163,10 @@ class Player(BaseBot):
 
             if r1 == r2 or (r1 >= 11 and r2 >= 11):
                 if can_raise:
-                    return self.pressure_raise(state, 1.5)
+                    return self.pressure_raise(state, params['preflop_raise'])
                 return ActionCall()
 
-            if cost <= pot * 0.25:
+            if cost <= pot * params['preflop_call']:
                 return ActionCall()
 
             return ActionFold()
@@ -154,8 +181,8 @@ class Player(BaseBot):
 
             if can_raise:
                 if texture == "wet":
-                    return self.pressure_raise(state, 1.6)
-                return self.pressure_raise(state, 1.2)
+                    return self.pressure_raise(state, params['overpair_wet_raise'])
+                return self.pressure_raise(state, params['overpair_raise'])
 
             return ActionCall()
 
@@ -164,7 +191,7 @@ class Player(BaseBot):
         if hand_type == "top_pair":
 
             if can_raise:
-                return self.pressure_raise(state, 1.0)
+                return self.pressure_raise(state, params['top_pair_raise'])
 
             return ActionCall()
 
@@ -172,7 +199,7 @@ class Player(BaseBot):
 
         if hand_type == "mid_pair":
 
-            if cost <= pot * 0.4:
+            if cost <= pot * params['mid_pair_call']:
                 return ActionCall()
 
             return ActionFold()
@@ -181,18 +208,18 @@ class Player(BaseBot):
 
         if draw:
 
-            if can_raise and random.random() < 0.65:
-                return self.pressure_raise(state, 1.1)
+            if can_raise and random.random() < params['semi_bluff_freq']:
+                return self.pressure_raise(state, params['semi_bluff_raise'])
 
-            if cost <= pot * 0.45:
+            if cost <= pot * params['draw_call']:
                 return ActionCall()
 
             return ActionFold()
 
         # -------- AIR (CONTROLLED BLUFFING) --------
 
-        if can_raise and random.random() < 0.35:
-            return self.pressure_raise(state, 0.8)
+        if can_raise and random.random() < params['bluff_freq']:
+            return self.pressure_raise(state, params['bluff_raise'])
 
         if state.can_act(ActionCheck):
             return ActionCheck()
@@ -1,72 +1,74 @@
-import random
-import eval7
 from pkbot.actions import ActionFold, ActionCall, ActionCheck, ActionRaise, ActionBid
 from pkbot.states import GameInfo, PokerState
 from pkbot.base import BaseBot
 from pkbot.runner import parse_args, run_bot
-
-# We define the ranks and suits to reconstruct a deck efficiently
-RANKS = "23456789TJQKA"
-SUITS = "cdhs"
-ALL_CARDS = [r + s for r in RANKS for s in SUITS]
-
-def calc_equity(my_cards_str, board_cards_str, opp_revealed_card=None, iters=300):
-    """
-    Calculate the equity of our hand using Monte Carlo simulations with eval7.
-    """
-    # 1. Parse our cards and board
-    my_hand = [eval7.Card(c) for c in my_cards_str]
-    board = [eval7.Card(c) for c in board_cards_str]
-    
-    # 2. Build the remaining deck
-    known_cards = my_hand + board
-    if opp_revealed_card:
-        known_cards.append(eval7.Card(opp_revealed_card))
-
-    # Fast deck construction by skipping known cards
-    known_set = set(known_cards)
-    deck = [eval7.Card(c) for c in ALL_CARDS if eval7.Card(c) not in known_set]
-    
-    wins = 0
-    ties = 0
-
-    # 3. MC Loop
-    for _ in range(iters):
-        # We need to draw:
-        # - remaining board cards to make it 5
-        # - opponent hole cards (2 if none revealed, 1 if one revealed)
-        cards_needed = (5 - len(board)) + (1 if opp_revealed_card else 2)
-        
-        # sample without replacement
-        drawn = random.sample(deck, cards_needed)
-        
-        sim_board = board + drawn[:5 - len(board)]
-        
-        if opp_revealed_card:
-            sim_opp = [eval7.Card(opp_revealed_card), drawn[-1]]
-        else:
-            sim_opp = drawn[5 - len(board):]
-
-        my_score = eval7.evaluate(my_hand + sim_board)
-        opp_score = eval7.evaluate(sim_opp + sim_board)
-
-        if my_score > opp_score:
-            wins += 1
-        elif my_score == opp_score:
-            ties += 1
-
-    return (wins + 0.5 * ties) / iters
+from pkbot.equity import DECK
+from pkbot.incremental import HandEquity
+from pkbot.auction import AuctionEngine
+from pkbot.bidding import BidModel
+from pkbot.opponent import OpponentStats
+from pkbot.ponder import Ponderer
 
 class Player(BaseBot):
     def __init__(self) -> None:
         self.total_rounds = 1000
-        pass
+        self.hand_equity = None
+        self.ponder_equity = None
+        self.pondered_board = None
+        # the observer feeds every opponent bid to the model the auction answers from
+        bids = BidModel()
+        self.observer = OpponentStats(bids=bids)
+        self.auction = AuctionEngine(bids=bids)
+        self.ponderer = Ponderer()
 
     def on_hand_start(self, game_info: GameInfo, current_state: PokerState) -> None:
-        pass
+        # keeps this hand's samples so later streets can reuse them
+        self.hand_equity = HandEquity(current_state.my_hand)
+        # the ponder thread samples into its own, so the two threads never share one
+        self.ponder_equity = HandEquity(current_state.my_hand)
 
     def on_hand_end(self, game_info: GameInfo, current_state: PokerState) -> None:
-        pass
+        # nothing queued for this hand is of use any more
+        self.ponderer.clear()
+        self.pondered_board = None
+        self.hand_equity = None
+        self.ponder_equity = None
+
+    def calc_equity(self, board_cards_str, opp_revealed_card=None, iters=300):
+        """
+        Calculate the equity of our hand, reusing samples from earlier streets
+        and anything pondered for this street.
+        """
+        key = ('equity', tuple(self.hand_equity.my_hand), tuple(board_cards_str), opp_revealed_card)
+        return self.ponderer.get(key, self.hand_equity.equity, board_cards_str, opp_revealed_card, iters).equity
+
+    def flop_equity(self, my_hand, board_cards_str, opp_revealed_card=None):
+        """
+        Our exact flop equity, from the auction's equities after each card the opponent could show.
+        """
+        key = ('flop', tuple(my_hand), tuple(board_cards_str))
+        equity, card_equity = self.ponderer.get(key, self.auction.card_equities, my_hand, board_cards_str)
+        return card_equity.get(opp_revealed_card, equity) if opp_revealed_card else equity
+
+    def ponder(self, game_info: GameInfo, current_state: PokerState) -> None:
+        # think on the opponent's time: this street's equities, then the next street's for every card
+        if current_state.is_terminal or not current_state.board:
+            return
+        my_hand, board = current_state.my_hand, current_state.board
+        opp_revealed = current_state.opp_revealed_cards[0] if current_state.opp_revealed_cards else None
+        if len(board) != self.pondered_board:
+            # a new street: this street's lookup is done, the last street's queue is stale
+            self.ponderer.clear()
+            self.pondered_board = len(board)
+        if len(board) == 3:
+            self.ponderer.submit(('flop', tuple(my_hand), tuple(board)), self.auction.card_equities, my_hand, board)
+        if len(board) < 5:
+            seen = set(my_hand) | set(board) | set(current_state.opp_revealed_cards)
+            for card in DECK:
+                if card not in seen:
+                    next_board = list(board) + [card]
+                    self.ponderer.submit(('equity', tuple(my_hand), tuple(next_board), opp_revealed),
+                                         self.ponder_equity.equity, next_board, opp_revealed, 200)
 
     def get_move(self, game_info: GameInfo, current_state: PokerState) -> ActionFold | ActionCall | ActionCheck | ActionRaise | ActionBid:
         # Parse inputs
@@ -77,32 +79,26 @@ class Player(BaseBot):
 
         opp_revealed = current_state.opp_revealed_cards[0] if current_state.opp_revealed_cards else None
 
-        # --- Auction Logic (Pre-Flop) ---
+        # --- Auction Logic (Flop) ---
         if street == 'auction':
-            # Preflop equity
-            equity = calc_equity(current_state.my_hand, [], opp_revealed, iters=300)
-            
-            # If we have a strong hand, bid to win the auction and gain info.
-            if equity > 0.55:
-                # E.g. Equity 0.65 -> bid ~ 6% of our stack
-                bid_fraction = max(0.0, equity - 0.5) * 0.6
-                bid_amt = int(my_chips * bid_fraction)
-            else:
-                bid_amt = 0
-                
-            return ActionBid(min(bid_amt, my_chips))
+            # Bid what seeing one of the opponent's cards is worth to us
+            value = self.auction.value(current_state.my_hand, current_state.board, pot, stack=my_chips)
+            return ActionBid(value.max_bid)
 
         # --- Flop/Turn/River/Pre-Flop Action Logic ---
         
         # Determine simulation iterations based on street and time. 
         # For simplicity, 200 is fast enough with eval7
-        equity = calc_equity(current_state.my_hand, current_state.board, opp_revealed, iters=200)
+        if len(current_state.board) == 3:
+            equity = self.flop_equity(current_state.my_hand, current_state.board, opp_revealed)
+        else:
+            equity = self.calc_equity(current_state.board, opp_revealed, iters=200)
 
         pot_odds = cost_to_call / (pot + cost_to_call) if (pot + cost_to_call) > 0 else 0
 
         # Action: Raise
         if current_state.can_act(ActionRaise) and equity > 0.65:
-            min_raise, max_raise = current_state.get_raise_limits()
+            min_raise, max_raise = current_state.raise_bounds
             # Try to raise around half the pot
             desired_raise = cost_to_call + (pot // 2)
             actual_raise = max(min_raise, min(desired_raise, max_raise))
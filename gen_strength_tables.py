@@ -0,0 +1,68 @@
+'''
+Builds pkbot/data/strength.bin, the flop hand strength table read by pkbot.strength.flop_strength.
+
+For each of the 1755 suit-isomorphic flops, pkbot.strength.flop_table scores
+every hole-card combo over a shared sample of turn and river cards and
+records HS, E[HS], E[HS^2], PPot and NPot, each quantized to 16 bits. With the
+default 48 runouts a flop takes about 1.5 s on one core, so use --workers.
+The table is about 23 MB.
+
+Usage: python gen_strength_tables.py [--runouts N] [--workers N] [--seed S] [--out PATH]
+'''
+import argparse
+import itertools
+import multiprocessing
+import os
+import random
+import time
+
+import numpy as np
+
+from pkbot.canonical import canonicalize
+from pkbot.equity import DECK
+from pkbot.ranges import COMBO_CARDS
+from pkbot.strength import FIELDS, FLOPS, HEADER, MAGIC, SCALE, TABLE_PATH, VERSION, flop_table
+
+
+def canonical_flops():
+    '''
+    One canonical representative per flop class, by Isomorphism index.
+    '''
+    flops = {}
+    for flop in itertools.combinations(DECK, 3):
+        index = FLOPS.index([flop])
+        if index not in flops:
+            flops[index] = canonicalize([flop])[0]
+    return flops
+
+
+def build_flop(args):
+    index, flop, runouts, seed = args
+    table = flop_table(flop, runouts, random.Random(seed))
+    return index, np.round(table * SCALE).astype(np.uint16)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runouts', type=int, default=48, help='Turn and river cards sampled per flop')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes')
+    parser.add_argument('--seed', type=int, default=2026)
+    parser.add_argument('--out', type=str, default=TABLE_PATH)
+    args = parser.parse_args()
+
+    flops = canonical_flops()
+    assert len(flops) == FLOPS.size
+    jobs = [(index, flop, args.runouts, args.seed * 1000003 + index) for index, flop in sorted(flops.items())]
+    table = np.zeros((FLOPS.size, len(COMBO_CARDS), len(FIELDS)), dtype=np.uint16)
+    t0 = time.perf_counter()
+    with multiprocessing.Pool(args.workers) as pool:
+        for done, (index, values) in enumerate(pool.imap_unordered(build_flop, jobs), 1):
+            table[index] = values
+            if done % 50 == 0 or done == len(jobs):
+                print(f"{done}/{len(jobs)} flops, {time.perf_counter() - t0:.1f}s", flush=True)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, 'wb') as out:
+        out.write(HEADER.pack(MAGIC, VERSION, args.runouts))
+        out.write(table.tobytes())
+    print(f"Wrote {args.out} ({FLOPS.size} flops, {args.runouts} runouts each) in {time.perf_counter() - t0:.1f}s")
@@ -0,0 +1,382 @@
+'''
+Mines engine logs into per-hand training data and per-opponent profiles.
+
+Every .glog under the log folder (full or --small_log format) is parsed line by
+line in a worker process and written as one compressed columnar shard,
+<out>/<path under the log folder>.npz (logs/a/b.glog becomes <out>/a/b.npz,
+so same-named logs in different folders keep their own shards), holding one
+row per hand:
+
+  seat_player (N, 2)  index into players of the small blind and big blind
+  hole (N, 2, 2)      hole cards per seat, as card indices (rank * 4 + suit)
+  board (N, 5)        community cards dealt, -1 where not reached
+  bids (N, 2)         auction bids per seat, -1 without an auction
+  auction_pot (N,)    chips in the pot when the auction was held
+  revealed (N, 2)     card each seat was shown by winning the auction, or -1
+  showdown (N,)       whether the hand went to showdown
+  payoff (N, 2)       chips won per seat
+  action_offsets (N + 1,) and action_seat, action_street, action_code,
+  action_amount       the betting actions of hand i in rows offsets[i]:offsets[i + 1];
+                      codes are the engine's letters F, C, K and R as bytes
+
+Per-player aggregates (VPIP, preflop raises, aggression per street, bids by
+flop hand type and bid size against the pot, hands shown down per class,
+illegal actions) are kept in <out>/profiles.json and merged as counts, so a
+rerun only parses logs that are new or changed since the last one. .plog
+files add the number of lines each bot printed and the exceptions it raised.
+
+Usage: python mine_logs.py [--logs DIR] [--out DIR] [--workers N] [--rebuild]
+'''
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import time
+
+import numpy as np
+
+from config import GAME_LOG_FOLDER
+from pkbot.equity import DECK
+from pkbot.evaluator import HAND_TYPES, HANDTYPE_SHIFT, evaluate
+from pkbot.preflop import NUM_CLASSES, class_name, hand_class
+
+CARD_INDEX = {card: i for i, card in enumerate(DECK)}
+STREETS = ('pre-flop', 'flop', 'turn', 'river')
+STREET_NAMES = {'Flop': 1, 'Turn': 2, 'River': 3}
+FULL_ACTIONS = (('folds', 'F'), ('calls', 'C'), ('checks', 'K'), ('bids ', 'A'), ('bets ', 'R'), ('raises to ', 'R'))
+# edges of the bid / pot histogram; the last bucket is open
+BID_EDGES = (0., 0.1, 0.25, 0.5, 1., 2., 4.)
+ROUND_LINE = re.compile(r'^Round #(\d+), (.+) \((-?\d+)\), (.+) \((-?\d+)\)$')
+BOARD_LINE = re.compile(r'^(Flop|Turn|River) \[([^\]]*)\], (.+) \((-?\d+)\), (.+) \((-?\d+)\)$')
+EXCEPTION_LINE = re.compile(r'^([A-Za-z_][\w.]*(Error|Exception|Interrupt|Exit))\b')
+
+
+def cards(text):
+    '''
+    Card indices of a bracketed engine card list such as '[Ah Kd]'.
+    '''
+    return [CARD_INDEX[card] for card in text.strip('[]').split()]
+
+
+def new_profile():
+    return {
+        'hands': 0, 'vpip': 0, 'pfr': 0, 'payoff': 0, 'illegal': 0,
+        'raises': [0] * len(STREETS), 'calls': [0] * len(STREETS), 'folds': [0] * len(STREETS),
+        'bids': 0, 'bid_total': 0, 'bid_histogram': [0] * len(BID_EDGES),
+        'bid_by_type': [[0, 0] for _ in HAND_TYPES],
+        'dealt': [0] * NUM_CLASSES, 'shown': [0] * NUM_CLASSES,
+        'log_lines': 0, 'exceptions': {},
+    }
+
+
+def merge_profile(total, part):
+    '''
+    Adds the counts of part into total, both in the new_profile layout.
+    '''
+    for key, value in part.items():
+        if isinstance(value, dict):
+            for name, count in value.items():
+                total[key][name] = total[key].get(name, 0) + count
+        elif isinstance(value, list) and value and isinstance(value[0], list):
+            for row, counts in zip(total[key], value):
+                for i, count in enumerate(counts):
+                    row[i] += count
+        elif isinstance(value, list):
+            for i, count in enumerate(value):
+                total[key][i] += count
+        else:
+            total[key] += value
+    return total
+
+
+class Hand():
+    '''
+    One hand as it is parsed; seat 0 is the small blind.
+    '''
+
+    def __init__(self, names):
+        self.names = names
+        self.hole = [[-1, -1], [-1, -1]]
+        self.board = []
+        self.bids = [-1, -1]
+        self.auction_pot = 0
+        self.revealed = [-1, -1]
+        self.showdown = False
+        self.payoff = [0, 0]
+        self.actions = []
+        self.street = 0
+
+    def seat(self, name):
+        return self.names.index(name)
+
+
+class Shard():
+    '''
+    Collects parsed hands as columns and folds them into the players' profiles.
+    '''
+
+    def __init__(self):
+        self.players = []
+        self.profiles = {}
+        self.columns = {key: [] for key in ('seat_player', 'hole', 'board', 'bids', 'auction_pot', 'revealed',
+                                            'showdown', 'payoff')}
+        self.offsets = [0]
+        self.actions = []
+
+    def player(self, name):
+        if name not in self.profiles:
+            self.players.append(name)
+            self.profiles[name] = new_profile()
+        return self.players.index(name)
+
+    def add(self, hand):
+        columns = self.columns
+        columns['seat_player'].append([self.player(name) for name in hand.names])
+        columns['hole'].append(hand.hole)
+        columns['board'].append(hand.board + [-1] * (5 - len(hand.board)))
+        columns['bids'].append(hand.bids)
+        columns['auction_pot'].append(hand.auction_pot)
+        columns['revealed'].append(hand.revealed)
+        columns['showdown'].append(hand.showdown)
+        columns['payoff'].append(hand.payoff)
+        self.actions.extend(hand.actions)
+        self.offsets.append(len(self.actions))
+        for seat, name in enumerate(hand.names):
+            self.profile(self.profiles[name], hand, seat)
+
+    @staticmethod
+    def profile(profile, hand, seat):
+        profile['hands'] += 1
+        profile['payoff'] += hand.payoff[seat]
+        vpip = pfr = False
+        for acting, street, code, _ in hand.actions:
+            if acting != seat:
+                continue
+            if code == 'R':
+                profile['raises'][street] += 1
+            elif code == 'C':
+                profile['calls'][street] += 1
+            elif code == 'F':
+                profile['folds'][street] += 1
+            if street == 0:
+                vpip = vpip or code in 'CR'
+                pfr = pfr or code == 'R'
+        profile['vpip'] += vpip
+        profile['pfr'] += pfr
+        if -1 not in hand.hole[seat]:
+            hole_cards = [DECK[card] for card in hand.hole[seat]]
+            profile['dealt'][hand_class(hole_cards)] += 1
+            if hand.showdown:
+                profile['shown'][hand_class(hole_cards)] += 1
+            if hand.bids[seat] >= 0 and len(hand.board) >= 3:
+                made = evaluate(hole_cards + [DECK[card] for card in hand.board[:3]]) >> HANDTYPE_SHIFT
+                profile['bid_by_type'][made][0] += 1
+                profile['bid_by_type'][made][1] += hand.bids[seat]
+        if hand.bids[seat] >= 0:
+            bid = hand.bids[seat]
+            profile['bids'] += 1
+            profile['bid_total'] += bid
+            profile['bid_histogram'][sum(bid > edge * hand.auction_pot for edge in BID_EDGES[1:])] += 1
+
+    def arrays(self):
+        arrays = {
+            'players': np.array(self.players),
+            'seat_player': np.array(self.columns['seat_player'], dtype=np.int16).reshape(-1, 2),
+            'hole': np.array(self.columns['hole'], dtype=np.int8).reshape(-1, 2, 2),
+            'board': np.array(self.columns['board'], dtype=np.int8).reshape(-1, 5),
+            'bids': np.array(self.columns['bids'], dtype=np.int32).reshape(-1, 2),
+            'auction_pot': np.array(self.columns['auction_pot'], dtype=np.int32),
+            'revealed': np.array(self.columns['revealed'], dtype=np.int8).reshape(-1, 2),
+            'showdown': np.array(self.columns['showdown'], dtype=bool),
+            'payoff': np.array(self.columns['payoff'], dtype=np.int32).reshape(-1, 2),
+            'action_offsets': np.array(self.offsets, dtype=np.int32),
+        }
+        actions = np.array([a[:2] + (ord(a[2]), a[3]) for a in self.actions], dtype=np.int32).reshape(-1, 4)
+        arrays['action_seat'] = actions[:, 0].astype(np.int8)
+        arrays['action_street'] = actions[:, 1].astype(np.int8)
+        arrays['action_code'] = actions[:, 2].astype(np.uint8)
+        arrays['action_amount'] = actions[:, 3]
+        return arrays
+
+
+def parse_line(line, hand, shard):
+    '''
+    Applies one game log line to the hand being parsed.
+    '''
+    board = BOARD_LINE.match(line)
+    if board is not None:
+        street = STREET_NAMES[board.group(1)]
+        if street == 1 and hand.street == 0:
+            # the first flop line opens the auction
+            hand.auction_pot = int(board.group(4)) + int(board.group(6))
+        hand.street = street
+        hand.board = cards(board.group(2))
+        return
+    for name in sorted(hand.names, key=len, reverse=True):
+        if line.startswith(name + ' ') or line.startswith(name + ':'):
+            break
+    else:
+        return
+    seat = hand.seat(name)
+    rest = line[len(name):]
+    if rest.startswith(': ['):
+        hand.hole[seat] = cards(rest[2:])
+    elif rest.startswith(': '):
+        hand.payoff[seat] = int(rest[2:])
+    elif rest.startswith(' received '):
+        hand.hole[seat] = cards(rest[len(' received '):])
+    elif rest.startswith(' awarded '):
+        hand.payoff[seat] = int(rest[len(' awarded '):])
+    elif rest.startswith(' shows '):
+        hand.showdown = True
+        hand.hole[seat] = cards(rest[len(' shows '):])
+    elif rest.startswith(' won the auction and was revealed '):
+        hand.revealed[seat] = cards(rest[len(' won the auction and was revealed '):])[0]
+    elif rest.startswith(' attempted illegal') or rest.startswith(' response misformatted'):
+        shard.profiles[name]['illegal'] += 1
+    elif rest.startswith(' posts blind'):
+        pass
+    else:
+        rest = rest[1:]
+        for phrase, code in FULL_ACTIONS:
+            if rest.startswith(phrase):
+                amount = rest[len(phrase):]
+                break
+        else:
+            code, amount = rest[:1], rest[1:]
+        if code == 'A':
+            hand.bids[seat] = int(amount)
+        elif code in ('F', 'C', 'K', 'R'):
+            hand.actions.append((seat, hand.street, code, int(amount) if amount else 0))
+
+
+def shard_path(path, logs, out):
+    '''
+    Where the shard of the log at path goes: its path relative to logs, under out.
+    '''
+    return os.path.join(out, os.path.splitext(os.path.relpath(path, logs))[0] + '.npz')
+
+
+def mine_game_log(path, shard_file):
+    '''
+    Parses one .glog into the shard shard_file; returns (hands, profiles).
+    '''
+    shard = Shard()
+    hand = None
+    with open(path, errors='replace') as log_file:
+        for line in log_file:
+            line = line.rstrip('\n')
+            if not line:
+                continue
+            round_line = ROUND_LINE.match(line)
+            if round_line is not None:
+                if hand is not None:
+                    shard.add(hand)
+                hand = Hand([round_line.group(2), round_line.group(4)])
+                for name in hand.names:
+                    shard.player(name)
+            elif line.startswith('Final'):
+                break
+            elif hand is not None:
+                parse_line(line, hand, shard)
+    if hand is not None:
+        shard.add(hand)
+    os.makedirs(os.path.dirname(shard_file), exist_ok=True)
+    np.savez_compressed(shard_file, **shard.arrays())
+    return len(shard.offsets) - 1, shard.profiles
+
+
+def mine_player_log(path):
+    '''
+    Counts the lines a bot printed and the exceptions it raised; returns (0, profiles).
+    '''
+    profile = new_profile()
+    in_traceback = False
+    with open(path, 'rb') as log_file:
+        for raw in log_file:
+            line = raw.decode(errors='replace').rstrip('\n')
+            profile['log_lines'] += 1
+            if line.startswith('Traceback (most recent call last)'):
+                in_traceback = True
+            elif in_traceback and not line.startswith(' '):
+                in_traceback = False
+                exception = EXCEPTION_LINE.match(line)
+                kind = exception.group(1) if exception else 'unknown'
+                profile['exceptions'][kind] = profile['exceptions'].get(kind, 0) + 1
+    return 0, {os.path.splitext(os.path.basename(path))[0]: profile}
+
+
+def mine(args):
+    path, logs, out = args
+    if path.endswith('.glog'):
+        return (path,) + mine_game_log(path, shard_path(path, logs, out))
+    return (path,) + mine_player_log(path)
+
+
+def summary(profile):
+    '''
+    Headline rates of a profile.
+    '''
+    hands = max(profile['hands'], 1)
+    raises = sum(profile['raises'][1:])
+    calls = sum(profile['calls'][1:])
+    shown = np.array(profile['shown'])
+    return {
+        'hands': profile['hands'],
+        'vpip': profile['vpip'] / hands,
+        'pfr': profile['pfr'] / hands,
+        'aggression': raises / calls if calls else float(raises),
+        'mean_bid': profile['bid_total'] / profile['bids'] if profile['bids'] else 0.,
+        'bid_by_type': {HAND_TYPES[t]: total / count for t, (count, total) in enumerate(profile['bid_by_type']) if count},
+        'top_shown': [class_name(c) for c in np.argsort(-shown)[:10] if shown[c]],
+        'illegal': profile['illegal'],
+        'exceptions': profile['exceptions'],
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--logs', type=str, default=GAME_LOG_FOLDER, help='Folder searched for .glog and .plog files')
+    parser.add_argument('--out', type=str, default=os.path.join(GAME_LOG_FOLDER, 'mined'))
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes')
+    parser.add_argument('--rebuild', action='store_true', help='Reparse every log instead of only new ones')
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    state_path = os.path.join(args.out, 'profiles.json')
+    state = {'files': {}, 'profiles': {}}
+    if os.path.exists(state_path) and not args.rebuild:
+        with open(state_path) as state_file:
+            state = json.load(state_file)
+
+    jobs = []
+    for root, _, files in os.walk(args.logs):
+        if os.path.abspath(root).startswith(os.path.abspath(args.out)):
+            continue
+        for file_name in sorted(files):
+            if not file_name.endswith(('.glog', '.plog')):
+                continue
+            path = os.path.join(root, file_name)
+            stat = os.stat(path)
+            # a .plog is rewritten by every match, so a changed one holds a new match
+            if state['files'].get(path) != [stat.st_size, stat.st_mtime]:
+                jobs.append((path, args.logs, args.out))
+                state['files'][path] = [stat.st_size, stat.st_mtime]
+
+    t0 = time.perf_counter()
+    total_hands = 0
+    with multiprocessing.Pool(args.workers) as pool:
+        for done, (path, hands, profiles) in enumerate(pool.imap_unordered(mine, jobs), 1):
+            total_hands += hands
+            for name, profile in profiles.items():
+                merge_profile(state['profiles'].setdefault(name, new_profile()), profile)
+            print(f"{done}/{len(jobs)} {path}: {hands} hands, {time.perf_counter() - t0:.1f}s", flush=True)
+
+    with open(state_path + '.tmp', 'w') as state_file:
+        json.dump(state, state_file, separators=(',', ':'))
+    os.replace(state_path + '.tmp', state_path)
+    elapsed = time.perf_counter() - t0
+    print(f"Mined {total_hands} hands from {len(jobs)} logs in {elapsed:.1f}s")
+    for name, profile in sorted(state['profiles'].items()):
+        print(name, json.dumps(summary(profile)))
@@ -0,0 +1,150 @@
+'''
+Value of information for the flop auction.
+
+The winner of the auction sees one of the loser's hole cards, chosen at random,
+and pays the loser's bid; on a tie both pay and both see a card. Since the
+price is the other player's bid, bidding what the auction is really worth to
+us is the best strategy, whatever the opponent does. That worth is what
+seeing a card adds to our EV, plus what the opponent would gain from seeing
+one of ours had they won instead.
+
+A paid bid comes out of the payer's stack, and the engine settles the hand on
+what each player has put in, so the bid goes to the opponent only if we then
+lose the hand or fold. Winning the auction at a price therefore costs the
+price times our chance of not winning the hand after the reveal.
+'''
+import threading
+from collections import OrderedDict, namedtuple
+import numpy as np
+from .canonical import canonical_key, suit_relabel
+from .equity import DECK
+from .ranges import HOLDS, combo_equities
+
+AuctionValue = namedtuple('AuctionValue', ['equity', 'card_equity', 'value', 'max_bid', 'bid_cost'])
+
+# floor on the share of a paid bid counted as lost, so a near-certain winner's bid stays finite
+MIN_BID_COST = 0.05
+
+
+def card_equities(my_hand, board):
+    '''
+    Returns (equity, card_equity): our exact equity against a random hand, and
+    for every card the opponent could hold, our equity once that card is
+    revealed. Each such card is equally likely to be the one revealed.
+    '''
+    equities = combo_equities(my_hand, board)
+    alive = ~np.isnan(equities)
+    holds = HOLDS[alive].astype(np.float64)
+    hands = holds.sum(axis=0)
+    by_card = (holds.T @ equities[alive]) / np.maximum(hands, 1.)
+    card_equity = {DECK[i]: float(by_card[i]) for i in np.flatnonzero(hands)}
+    return float(equities[alive].mean()), card_equity
+
+
+def continue_value(equity, pot, bet):
+    '''
+    EV, relative to folding, of putting in bet more to see a showdown for pot + 2 * bet.
+    '''
+    return max(0., equity * (pot + 2 * bet) - bet)
+
+
+def information_value(equity, card_equity, pot, bet):
+    '''
+    What seeing a card is worth when the hand then comes down to calling bet or folding.
+    '''
+    informed = sum(continue_value(e, pot, bet) for e in card_equity.values()) / len(card_equity)
+    return informed - continue_value(equity, pot, bet)
+
+
+def bid_cost(card_equity, pot, bet):
+    '''
+    The expected share of a paid bid we lose once a card is seen: all of it where
+    we would fold, and our chance of losing the showdown where we would continue.
+    '''
+    won = sum(e for e in card_equity.values() if continue_value(e, pot, bet) > 0.)
+    return 1. - won / len(card_equity)
+
+
+class AuctionEngine():
+    '''
+    Prices the auction from the value of information, caching per canonical flop.
+
+    card_equities is enumerated exactly once per suit-isomorphic (hand, board) with
+    the batch evaluator and stored in canonical suits, so repeated situations cost only
+    the pricing. The value model assumes the hand comes down to one decision to
+    put in bet (a pot-sized bet by default) or fold. max_bid adds
+    opponent_share times our own value for the information the opponent would
+    get by winning instead (1 treats the auction as symmetric), and divides by
+    bid_cost, the share of the price we expect to actually lose. The chips the
+    opponent pays us when they win are left out, so against a bidder who
+    bids near their worth this overbids slightly. Given a
+    pkbot.bidding.BidModel as bids, max_bid is its best response to the
+    opponent's observed bids instead. The cache is locked, so one engine can
+    be shared with a Ponderer thread.
+    '''
+
+    def __init__(self, maxsize=1024, opponent_share=1., bids=None):
+        self.maxsize = maxsize
+        self.bids = bids
+        self.opponent_share = opponent_share
+        self.entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def card_equities(self, my_hand, board):
+        '''
+        Same as card_equities, answered from the cache when possible.
+        '''
+        key = canonical_key(my_hand, board)
+        relabel = suit_relabel((my_hand, board))
+        with self._lock:
+            cached = self.entries.get(key)
+            if cached is not None:
+                self.hits += 1
+                self.entries.move_to_end(key)
+            else:
+                self.misses += 1
+        if cached is not None:
+            equity, canonical = cached
+            original = {new: old for old, new in relabel.items()}
+            return equity, {card[0] + original[card[1]]: e for card, e in canonical.items()}
+        # computed outside the lock; two threads may both score a new flop, the last one stays
+        equity, card_equity = card_equities(my_hand, board)
+        with self._lock:
+            self.entries[key] = (equity, {card[0] + relabel[card[1]]: e for card, e in card_equity.items()})
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return equity, card_equity
+
+    def value(self, my_hand, board, pot, bet=None, stack=None):
+        '''
+        Prices the auction for our hand on the given flop.
+
+        Arguments:
+        my_hand, board: card strings, e.g. current_state.my_hand and current_state.board.
+        pot: the chips in the pot, e.g. current_state.pot.
+        bet: the further bet the hand is assumed to come down to; defaults to the pot.
+        stack: our remaining chips; caps bet and the bid.
+
+        Returns:
+        AuctionValue(equity, card_equity, value, max_bid, bid_cost): our equity,
+        our equity after seeing each possible card, the value in chips of seeing
+        a card, the most the auction is worth to us and the expected share of a
+        paid bid we lose.
+        '''
+        if bet is None:
+            bet = pot
+        if stack is not None:
+            bet = min(bet, stack)
+        equity, card_equity = self.card_equities(my_hand, board)
+        value = information_value(equity, card_equity, pot, bet)
+        cost = max(bid_cost(card_equity, pot, bet), MIN_BID_COST)
+        if self.bids is not None:
+            max_bid = self.bids.best_response(value, pot, board, value * self.opponent_share, stack, cost).bid
+        else:
+            max_bid = int(value * (1. + self.opponent_share) / cost)
+            if stack is not None:
+                max_bid = min(max_bid, stack)
+        return AuctionValue(equity, card_equity, value, max_bid, cost)
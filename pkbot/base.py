@@ -3,6 +3,7 @@ This file contains the base class that you should implement for your pokerbot.
 '''
 from .actions import ActionFold, ActionCall, ActionCheck, ActionRaise, ActionBid
 from .states import GameInfo, PokerState
+from .watchdog import safe_action
 
 
 class BaseBot():
@@ -10,6 +11,11 @@ class BaseBot():
     The base class for a pokerbot.
     '''
 
+    # set to a pkbot.ponder.Ponderer to enable background computation
+    ponderer = None
+    # set to a pkbot.opponent.OpponentStats (or anything with observe and close) to see every engine clause
+    observer = None
+
     def on_hand_start(self, game_info: GameInfo, current_state: PokerState) -> None:
         '''
         Called when a new round starts. Called NUM_ROUNDS times.
@@ -36,6 +42,20 @@ class BaseBot():
         '''
         raise NotImplementedError('on_hand_end')
 
+    def ponder(self, game_info: GameInfo, current_state: PokerState) -> None:
+        '''
+        Optional. Called after every reply to the engine when self.ponderer is set.
+        Submit speculative work to self.ponderer here; it runs while we wait.
+
+        Arguments:
+        game_info: the GameInfo object.
+        current_state: the PokerState object.
+
+        Returns:
+        Nothing.
+        '''
+        pass
+
     def get_move(self, game_info: GameInfo, current_state: PokerState) -> ActionFold | ActionCall | ActionCheck | ActionRaise | ActionBid:
         '''
         Where the magic happens - your code should implement this function.
@@ -58,4 +78,19 @@ class BaseBot():
         elif ActionCheck in current_state.valid_actions:
             return ActionCheck()
         else:
-            return ActionFold()
\ No newline at end of file
+            return ActionFold()
+
+    def fallback_move(self, game_info: GameInfo, current_state: PokerState) -> ActionFold | ActionCheck | ActionBid:
+        '''
+        Optional. Called instead of waiting on get_move when it overruns the
+        decision deadline given to run_bot. Must be cheap. Override it to
+        answer from an anytime estimate kept up to date by get_move.
+
+        Arguments:
+        game_info: the GameInfo object.
+        current_state: the PokerState object.
+
+        Returns:
+        Your action. Defaults to bidding 0, checking, or folding.
+        '''
+        return safe_action(current_state)
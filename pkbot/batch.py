@@ -0,0 +1,140 @@
+'''
+Vectorized hand evaluation: scores many 5 to 7 card hands in one NumPy call.
+
+Cards are integers 0-51, rank * 4 + suit in the order of pkbot.equity.DECK.
+Hand values are encoded like eval7's (hand type in bits 24+, then up to five
+4-bit rank nibbles), so they compare directly with eval7.evaluate results.
+'''
+import numpy as np
+from .equity import DECK
+from .evaluator import (HANDTYPE_SHIFT, PAIR, TWO_PAIR, TRIPS, STRAIGHT, FLUSH, FULL_HOUSE, QUADS,
+                        STRAIGHT_FLUSH, build_tables)
+
+CARD_INDEX = {card: i for i, card in enumerate(DECK)}
+
+_tables = None
+
+
+def tables():
+    '''
+    The lookup tables as NumPy arrays, built on first use.
+    '''
+    global _tables
+    if _tables is None:
+        _tables = tuple(np.array(table, dtype=np.int64) for table in build_tables())
+    return _tables
+
+
+def to_indices(hands):
+    '''
+    Converts a list of hands given as card strings to an (N, k) integer array.
+    '''
+    return np.array([[CARD_INDEX[card] for card in hand] for hand in hands], dtype=np.int64)
+
+
+def evaluate_batch(cards):
+    '''
+    Scores every row of an (N, k) integer card array, 5 <= k <= 7.
+    Returns an int64 array of N hand values; higher is better.
+    '''
+    cards = np.asarray(cards, dtype=np.int64)
+    # one 52-bit mask per hand, 13 bits per suit
+    hand_mask = np.bitwise_or.reduce(np.left_shift(1, (cards & 3) * 13 + (cards >> 2)), axis=1)
+    sc, sd, sh, ss = ((hand_mask >> (13 * s)) & 0x1FFF for s in range(4))
+    return _evaluate(sc, sd, sh, ss, cards.shape[1])
+
+
+def evaluate_rank_counts(counts):
+    '''
+    Scores hands given only as an (N, 13) array of how many cards of each rank
+    they hold, ignoring flushes: the value every hand with those ranks has
+    unless it makes a flush.
+    '''
+    counts = np.asarray(counts, dtype=np.int64)
+    # spread the cards over the suits layer by layer; which suit holds which card never matters here
+    bits = np.left_shift(1, np.arange(13))
+    sc, sd, sh, ss = (((counts > layer) * bits).sum(axis=1) for layer in range(4))
+    return _evaluate(sc, sd, sh, ss, counts.sum(axis=1), flushes=False)
+
+
+def evaluate_flushes(suit_masks):
+    '''
+    Values of the flushes made by 13-bit rank masks of the cards of one suit,
+    each holding at least five cards.
+    '''
+    _, straight_table, _, top_five = tables()
+    straight_flush = straight_table[suit_masks]
+    return np.where(straight_flush > 0, (STRAIGHT_FLUSH << HANDTYPE_SHIFT) + (straight_flush << 16),
+                    (FLUSH << HANDTYPE_SHIFT) + top_five[suit_masks])
+
+
+def _evaluate(sc, sd, sh, ss, num_cards, flushes=True):
+    '''
+    Scores hands given as four 13-bit rank masks, one per suit.
+    '''
+    nbits, straight_table, top_card, top_five = tables()
+    ranks = sc | sd | sh | ss
+    n_dups = num_cards - nbits[ranks]
+
+    # flush and straight candidates; at most one suit can hold five of seven cards
+    flush_mask = np.zeros_like(ranks)
+    for suit_mask in (sc, sd, sh, ss) if flushes else ():
+        flush_mask = np.where(nbits[suit_mask] >= 5, suit_mask, flush_mask)
+    has_flush = flush_mask != 0
+    straight_flush = straight_table[flush_mask]
+    straight = straight_table[ranks]
+    made = np.where(has_flush, (FLUSH << HANDTYPE_SHIFT) + top_five[flush_mask],
+                    np.where(straight > 0, (STRAIGHT << HANDTYPE_SHIFT) + (straight << 16), 0))
+
+    odd = sc ^ sd ^ sh ^ ss
+    two_mask = ranks ^ odd
+    three_mask = ((sc & sd) | (sh & ss)) & ((sc & sh) | (sd & ss))
+    four_mask = sc & sd & sh & ss
+
+    high_card = top_five[ranks]
+    pair = (PAIR << HANDTYPE_SHIFT) + (top_card[two_mask] << 16) + ((top_five[ranks ^ two_mask] >> 4) & ~0xF)
+    two_pair_low = (TWO_PAIR << HANDTYPE_SHIFT) + (top_five[two_mask] & 0xFF000) + (top_card[ranks ^ two_mask] << 8)
+
+    trips_top = top_card[three_mask]
+    trips_rest = ranks ^ three_mask
+    trips_second = top_card[trips_rest]
+    trips = ((TRIPS << HANDTYPE_SHIFT) + (trips_top << 16) + (trips_second << 12)
+             + (top_card[trips_rest ^ np.left_shift(1, trips_second)] << 8))
+
+    quads_top = top_card[four_mask]
+    quads = (QUADS << HANDTYPE_SHIFT) + (quads_top << 16) + (top_card[ranks ^ np.left_shift(1, quads_top)] << 12)
+
+    full_top = top_card[three_mask]
+    full_house = ((FULL_HOUSE << HANDTYPE_SHIFT) + (full_top << 16)
+                  + (top_card[(two_mask | three_mask) ^ np.left_shift(1, full_top)] << 12))
+
+    pair_top = top_card[two_mask]
+    pair_second = top_card[two_mask ^ np.left_shift(1, pair_top)]
+    two_pair_high = ((TWO_PAIR << HANDTYPE_SHIFT) + (pair_top << 16) + (pair_second << 12)
+                     + (top_card[ranks ^ np.left_shift(1, pair_top) ^ np.left_shift(1, pair_second)] << 8))
+
+    return np.select(
+        [
+            has_flush & (straight_flush > 0),
+            (made > 0) & (n_dups < 3),
+            n_dups == 0,
+            n_dups == 1,
+            (n_dups == 2) & (two_mask != 0),
+            n_dups == 2,
+            four_mask != 0,
+            nbits[two_mask] != n_dups,
+            made > 0,
+        ],
+        [
+            (STRAIGHT_FLUSH << HANDTYPE_SHIFT) + (straight_flush << 16),
+            made,
+            high_card,
+            pair,
+            two_pair_low,
+            trips,
+            quads,
+            full_house,
+            made,
+        ],
+        two_pair_high,
+    )
@@ -0,0 +1,229 @@
+'''
+A streaming model of the opponent's auction bids and a best-response bid against it.
+
+Bids are kept per situation, bucketed by pot size and board wetness, as a fixed
+histogram of bid / pot plus a handful of exact amounts the opponent bids often
+(Misra-Gries heavy hitters), so bots that always bid the same number are seen
+exactly. Every update is constant time and memory never grows with the match.
+'''
+from collections import namedtuple
+from .features import texture
+
+# edges of the bid histogram, as fractions of the pot; the last bin is open
+FRACTIONS = (0., 1 / 32, 1 / 16, 1 / 8, 1 / 4, 1 / 2, 1., 2., 4., 8., 16., 32.)
+POT_EDGES = (60, 150, 400, 1000)
+WETNESS = ('dry', 'semi-wet', 'wet')
+HEAVY_HITTERS = 8
+
+BidChoice = namedtuple('BidChoice', ['bid', 'win', 'tie', 'cost', 'gain'])
+
+
+def pot_bucket(pot):
+    return sum(pot >= edge for edge in POT_EDGES)
+
+
+class BidSketch():
+    '''
+    Bid counts for one situation: a histogram of bid / pot and the most frequent exact bids.
+
+    Each frequent bid also remembers which histogram bins its counted
+    observations went to (the bin depends on the pot at the time), so the
+    exact bids and the rest of the histogram never count the same bid twice.
+    '''
+
+    def __init__(self):
+        self.total = 0
+        self.histogram = [0] * len(FRACTIONS)
+        self.frequent = {}
+        # frequent bid -> {histogram bin: observations counted in frequent}
+        self.frequent_bins = {}
+
+    def add(self, bid, pot):
+        self.total += 1
+        b = sum(bid >= edge * pot for edge in FRACTIONS[1:])
+        self.histogram[b] += 1
+        if bid in self.frequent or len(self.frequent) < HEAVY_HITTERS:
+            self.frequent[bid] = self.frequent.get(bid, 0) + 1
+            bins = self.frequent_bins.setdefault(bid, {})
+            bins[b] = bins.get(b, 0) + 1
+        else:
+            for amount in list(self.frequent):
+                self.frequent[amount] -= 1
+                # the observation given back to the histogram comes from the fullest bin
+                bins = self.frequent_bins[amount]
+                fullest = max(bins, key=bins.get)
+                bins[fullest] -= 1
+                if not bins[fullest]:
+                    del bins[fullest]
+                if not self.frequent[amount]:
+                    del self.frequent[amount]
+                    del self.frequent_bins[amount]
+
+    def distribution(self, pot, stack=None):
+        '''
+        Returns (atoms, bins): exact bids as (amount, probability), and the rest
+        of the mass as (low, high, probability) chip ranges, uniform within each.
+        The probabilities sum to 1.
+        '''
+        counts = list(self.histogram)
+        atoms = []
+        for amount, count in self.frequent.items():
+            for b, in_bin in self.frequent_bins[amount].items():
+                counts[b] -= in_bin
+            atoms.append((amount, count / self.total))
+        edges = [edge * pot for edge in FRACTIONS] + [max(stack or 0, 2 * FRACTIONS[-1] * pot)]
+        bins = [(edges[b], edges[b + 1], count / self.total) for b, count in enumerate(counts) if count > 0]
+        return atoms, bins
+
+    def to_dict(self):
+        return {'total': self.total, 'histogram': self.histogram,
+                'frequent': [[amount, count, [[b, n] for b, n in self.frequent_bins[amount].items()]]
+                             for amount, count in self.frequent.items()]}
+
+    def update(self, saved):
+        self.total += saved['total']
+        for b, count in enumerate(saved['histogram'][:len(FRACTIONS)]):
+            self.histogram[b] += count
+        for entry in saved['frequent']:
+            if len(entry) < 3:
+                # saved without its bins: leave that mass in the histogram
+                continue
+            amount, count, bins = entry
+            self.frequent[amount] = self.frequent.get(amount, 0) + count
+            merged = self.frequent_bins.setdefault(amount, {})
+            for b, n in bins:
+                merged[b] = merged.get(b, 0) + n
+        while len(self.frequent) > HEAVY_HITTERS:
+            amount = min(self.frequent, key=self.frequent.get)
+            del self.frequent[amount]
+            del self.frequent_bins[amount]
+
+
+def evaluate_bid(bid, atoms, bins, value, opponent_value, bid_cost=1.):
+    '''
+    The BidChoice of bidding bid against the given bid distribution.
+
+    gain is the expected improvement over losing the auction: winning adds our
+    value and denies the opponent theirs for the price of their bid, a tie shows
+    both players a card for our own bid. Only the bid_cost share of a price paid
+    counts against the gain, since a paid bid is lost only if we go on to lose
+    the hand; cost is the full expected price.
+    '''
+    worth = value + opponent_value
+    win = tie = cost = gain = 0.
+    for amount, p in atoms:
+        if amount < bid:
+            win += p
+            cost += p * amount
+            gain += p * (worth - amount * bid_cost)
+        elif amount == bid:
+            tie += p
+            cost += p * bid
+            gain += p * (value - bid * bid_cost)
+    for low, high, p in bins:
+        if bid <= low:
+            continue
+        below = p * min(1., (bid - low) / (high - low))
+        price = (low + min(bid, high)) / 2
+        win += below
+        cost += below * price
+        gain += below * (worth - price * bid_cost)
+    return BidChoice(bid, win, tie, cost, gain)
+
+
+class BidModel():
+    '''
+    Learns the opponent's auction bids over the match and answers with a best response.
+
+    Feed it every auction with observe (OpponentStats does this when given one
+    as bids=) and ask best_response for a bid. Bidding our full worth is always
+    safe in a second-price auction, but against a bidder who sticks to a few
+    amounts a bid just above them wins the same auctions at the same price while
+    putting far less at risk when our value estimate is off, so among the
+    bids with the highest expected gain the smallest is chosen. Situations with
+    fewer than min_count auctions fall back to all auctions pooled, and with
+    too little data overall the answer is simply our worth.
+    '''
+
+    def __init__(self, min_count=20):
+        self.min_count = min_count
+        self.pooled = BidSketch()
+        self.sketches = {}
+
+    def situation(self, pot, board):
+        return pot_bucket(pot), WETNESS.index(texture(board).wetness)
+
+    def observe(self, bid, pot, board):
+        '''
+        Records one opponent bid made with pot chips in the pot on board.
+        '''
+        key = self.situation(pot, board)
+        sketch = self.sketches.get(key)
+        if sketch is None:
+            sketch = self.sketches[key] = BidSketch()
+        sketch.add(bid, pot)
+        self.pooled.add(bid, pot)
+
+    def sketch(self, pot, board):
+        '''
+        The sketch used to predict a bid in this situation, or None without enough data.
+        '''
+        sketch = self.sketches.get(self.situation(pot, board))
+        if sketch is not None and sketch.total >= self.min_count:
+            return sketch
+        if self.pooled.total >= self.min_count:
+            return self.pooled
+        return None
+
+    def best_response(self, value, pot, board, opponent_value=None, stack=None, bid_cost=1.):
+        '''
+        The bid with the highest expected gain against the opponent's predicted bid.
+
+        Arguments:
+        value: what seeing a card is worth to us in chips, e.g. AuctionValue.value.
+        pot, board: the pot and flop the auction is held on.
+        opponent_value: what our card is worth to the opponent; defaults to value.
+        stack: our remaining chips, the largest legal bid.
+        bid_cost: the share of a paid bid we expect to lose, e.g. AuctionValue.bid_cost.
+
+        Returns:
+        BidChoice(bid, win, tie, cost, gain): the bid, the chances of winning and
+        tying with it, the expected chips paid and the expected gain in chips.
+        '''
+        if opponent_value is None:
+            opponent_value = value
+        worth = max(0, int((value + opponent_value) / bid_cost))
+        if stack is not None:
+            worth = min(worth, stack)
+        sketch = self.sketch(pot, board)
+        if sketch is None:
+            return BidChoice(worth, 0., 0., 0., 0.)
+        atoms, bins = sketch.distribution(pot, stack)
+        candidates = {0, worth}
+        for amount, _ in atoms:
+            candidates.update((amount, amount + 1))
+        for low, high, _ in bins:
+            candidates.update((int(low) + 1, int(high)))
+        best = None
+        for bid in sorted(candidates):
+            if bid > worth:
+                break
+            choice = evaluate_bid(bid, atoms, bins, value, opponent_value, bid_cost)
+            if best is None or choice.gain > best.gain + 1e-9:
+                best = choice
+        return best
+
+    def to_dict(self):
+        return {'pooled': self.pooled.to_dict(),
+                'sketches': [[list(key), sketch.to_dict()] for key, sketch in self.sketches.items()]}
+
+    def update(self, saved):
+        '''
+        Adds bids saved with to_dict, e.g. from an earlier match.
+        '''
+        self.pooled.update(saved['pooled'])
+        for key, sketch in saved['sketches']:
+            key = tuple(key)
+            if key not in self.sketches:
+                self.sketches[key] = BidSketch()
+            self.sketches[key].update(sketch)
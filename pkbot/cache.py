@@ -0,0 +1,98 @@
+'''
+A bounded LRU memo of equity results, keyed on the suit-canonical situation.
+'''
+import os
+import pickle
+from collections import OrderedDict
+from .canonical import canonical_key
+from .equity import EquityResult, combination_count, equity, known_cards
+
+
+def merge(a, b):
+    '''
+    Combines two independent Monte Carlo results for the same situation.
+    '''
+    if not b.samples:
+        return a
+    if not a.samples:
+        return b
+    samples = a.samples + b.samples
+    win = (a.win * a.samples + b.win * b.samples) / samples
+    tie = (a.tie * a.samples + b.tie * b.samples) / samples
+    mean = win + 0.5 * tie
+    # both estimates are unbiased, so the pooled stderr shrinks with the sample count
+    stderr = (a.stderr ** 2 * a.samples ** 2 + b.stderr ** 2 * b.samples ** 2) ** 0.5 / samples
+    return EquityResult(mean, stderr, samples, win, tie, 1. - win - tie)
+
+
+class EquityCache():
+    '''
+    Memoizes pkbot.equity.equity across decisions and hands.
+
+    Entries are keyed on canonical_key, so any suit permutation of a situation
+    seen before is a hit. A cached Monte Carlo result with fewer samples than
+    requested is topped up with just the missing samples and merged, so repeated
+    questions get more precise over the match. An exact result, one that visited
+    every possible showdown, is always a hit; a zero stderr alone does not make
+    a result exact, since a sample can win every time. At most maxsize entries are kept,
+    dropping the least recently used.
+    '''
+
+    def __init__(self, maxsize=4096, path=None):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def equity(self, my_hand, board, opp_known=None, samples=300, deadline=None):
+        '''
+        Same as pkbot.equity.equity, answered from the cache when possible.
+        '''
+        opp_known = known_cards(opp_known)
+        key = canonical_key(my_hand, board, opp_known)
+        cached = self.entries.get(key)
+        if cached is not None and (cached.samples >= samples
+                                   or cached.samples == combination_count(my_hand, board, opp_known)):
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return cached
+        self.misses += 1
+        if cached is None:
+            result = equity(my_hand, board, opp_known, samples, deadline)
+        else:
+            result = merge(cached, equity(my_hand, board, opp_known, samples - cached.samples, deadline))
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        '''
+        Drops all entries and resets the counters.
+        '''
+        self.entries.clear()
+        self.hits = self.misses = 0
+
+    def save(self, path):
+        '''
+        Writes the entries to path, most recently used last.
+        '''
+        with open(path, 'wb') as cache_file:
+            pickle.dump([(key, tuple(result)) for key, result in self.entries.items()], cache_file,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+
+    def load(self, path):
+        '''
+        Adds the entries saved in path, e.g. to start a match with a warm cache.
+        '''
+        with open(path, 'rb') as cache_file:
+            for key, result in pickle.load(cache_file):
+                self.entries[key] = EquityResult(*result)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
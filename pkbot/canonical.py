@@ -0,0 +1,162 @@
+'''
+Suit-isomorphic canonical keys and dense indices for hands and boards.
+
+Two situations that differ only by a renaming of suits have the same equities,
+so caches and lookup tables should be keyed on a canonical form. The cards are
+split into rounds (e.g. hole cards, board, revealed card); within a round the
+order of cards does not matter. Each suit is described by the ranks it holds
+in every round, and the sorted list of those per-suit descriptions is the
+canonical key. The dense index follows Waugh's hand isomorphism scheme.
+'''
+import math
+from itertools import combinations_with_replacement
+from .equity import RANKS, SUITS
+
+NUM_RANKS = len(RANKS)
+NUM_SUITS = len(SUITS)
+RANK_BIT = {r: 1 << i for i, r in enumerate(RANKS)}
+SUIT_INDEX = {s: i for i, s in enumerate(SUITS)}
+
+
+def suit_masks(groups):
+    '''
+    Returns, for each suit, the tuple of rank bitmasks it holds in each round.
+    '''
+    masks = [[0] * len(groups) for _ in range(NUM_SUITS)]
+    for r, cards in enumerate(groups):
+        for card in cards:
+            masks[SUIT_INDEX[card[1]]][r] |= RANK_BIT[card[0]]
+    return [tuple(m) for m in masks]
+
+
+def canonical_key(my_hand, board=(), opp_known=()):
+    '''
+    A hashable key shared by all suit permutations of (hole cards, board, revealed cards).
+    '''
+    return tuple(sorted(suit_masks((my_hand, board, opp_known)), reverse=True))
+
+
+def suit_relabel(groups):
+    '''
+    The suit renaming, e.g. {'h': 's', ...}, that canonicalize applies to the given groups.
+    '''
+    masks = suit_masks(groups)
+    order = sorted(range(NUM_SUITS), key=lambda s: masks[s], reverse=True)
+    return {SUITS[s]: SUITS[NUM_SUITS - 1 - i] for i, s in enumerate(order)}
+
+
+def canonicalize(groups):
+    '''
+    Relabels suits so that isomorphic inputs give identical card lists.
+    Returns the groups as lists of card strings, each sorted high card first.
+    '''
+    relabel = suit_relabel(groups)
+    return [sorted((card[0] + relabel[card[1]] for card in cards),
+                   key=lambda c: (RANKS.index(c[0]), SUITS.index(c[1])), reverse=True)
+            for cards in groups]
+
+
+def _colex(mask, available):
+    '''
+    Index of the ranks in mask among the ranks set in available, by the combinatorial number system.
+    '''
+    index = 0
+    position = 0
+    count = 0
+    for rank in range(NUM_RANKS):
+        bit = 1 << rank
+        if not available & bit:
+            continue
+        if mask & bit:
+            count += 1
+            index += math.comb(position, count)
+        position += 1
+    return index
+
+
+class Isomorphism():
+    '''
+    Dense indexing of suit-isomorphism classes for a fixed split of cards into rounds.
+
+    For example Isomorphism((3,)) indexes flops (1755 classes), Isomorphism((2,))
+    starting hands (169) and Isomorphism((2, 3)) hole cards plus flop (1,286,792).
+    '''
+
+    def __init__(self, rounds):
+        self.rounds = tuple(rounds)
+        self._config_offsets = {}
+        self.size = 0
+        for configs in self._suit_configurations():
+            self._config_offsets[configs] = self.size
+            self.size += self._configuration_size(configs)
+
+    def _suit_size(self, config):
+        size = 1
+        used = 0
+        for count in config:
+            size *= math.comb(NUM_RANKS - used, count)
+            used += count
+        return size
+
+    def _configuration_size(self, configs):
+        size = 1
+        for config, multiplicity in self._groups(configs):
+            size *= math.comb(self._suit_size(config) + multiplicity - 1, multiplicity)
+        return size
+
+    @staticmethod
+    def _groups(configs):
+        groups = []
+        for config in configs:
+            if groups and groups[-1][0] == config:
+                groups[-1][1] += 1
+            else:
+                groups.append([config, 1])
+        return groups
+
+    def _suit_configurations(self):
+        '''
+        Every way to spread each round's cards over four suits, as sorted tuples of per-suit counts.
+        '''
+        per_suit = [()]
+        for count in self.rounds:
+            per_suit = [c + (k,) for c in per_suit for k in range(count + 1) if sum(c) + k <= NUM_RANKS]
+        per_suit.sort(reverse=True)
+        configurations = []
+        for combo in combinations_with_replacement(range(len(per_suit)), NUM_SUITS):
+            configs = tuple(per_suit[i] for i in combo)
+            if all(sum(c[r] for c in configs) == count for r, count in enumerate(self.rounds)):
+                configurations.append(configs)
+        return configurations
+
+    def _suit_index(self, masks):
+        index = 0
+        used = 0
+        for mask in masks:
+            available = ((1 << NUM_RANKS) - 1) & ~used
+            index = index * math.comb(bin(available).count('1'), bin(mask).count('1')) + _colex(mask, available)
+            used |= mask
+        return index
+
+    def index(self, groups):
+        '''
+        The dense index (0 <= index < size) of the class of the given card groups.
+        '''
+        described = sorted(((tuple(bin(m).count('1') for m in masks), self._suit_index(masks))
+                            for masks in suit_masks(groups)), reverse=True)
+        configs = tuple(config for config, _ in described)
+        index = 0
+        position = 0
+        for config, multiplicity in self._groups(configs):
+            indices = sorted(i for _, i in described[position:position + multiplicity])
+            position += multiplicity
+            # rank of a multiset among all multisets of this size
+            within = sum(math.comb(i + j, j + 1) for j, i in enumerate(indices))
+            index = index * math.comb(self._suit_size(config) + multiplicity - 1, multiplicity) + within
+        return self._config_offsets[configs] + index
+
+    def key(self, groups):
+        '''
+        The canonical key of the given card groups.
+        '''
+        return tuple(sorted(suit_masks(groups), reverse=True))
@@ -0,0 +1,294 @@
+'''
+Showdown equity estimation shared by the bots.
+'''
+import itertools
+import math
+import random
+from collections import namedtuple
+from .evaluator import RANKS, SUITS
+from .startup import lazy_import
+from .watchdog import current_deadline
+
+eval7 = lazy_import('eval7')
+
+DECK = [r + s for r in RANKS for s in SUITS]
+
+EquityResult = namedtuple('EquityResult', ['equity', 'stderr', 'samples', 'win', 'tie', 'loss'])
+
+# how many samples to draw between deadline checks
+CHECK_EVERY = 32
+# enumerate exactly when there are at most this many (opponent hand, runout) pairs
+EXACT_BUDGET = 2500
+# sampling schemes understood by monte_carlo_equity
+METHODS = ('random', 'stratified', 'qmc', 'control')
+# one prime per card dealt, at most five board cards and two opponent cards
+HALTON_BASES = (2, 3, 5, 7, 11, 13, 17)
+
+_cards = {}
+_halton_cache = {}
+
+
+def to_cards(cards):
+    '''
+    Converts card strings such as 'As' to eval7 Cards, reusing one object per card.
+    '''
+    if not _cards:
+        for card in DECK:
+            _cards[card] = eval7.Card(card)
+    return [_cards[card] for card in cards]
+
+
+def known_cards(opp_known):
+    '''
+    Normalizes an opponent card argument: None, a single card string, or a list
+    such as current_state.opp_revealed_cards.
+    '''
+    if not opp_known:
+        return []
+    if isinstance(opp_known, str):
+        return [opp_known]
+    return list(opp_known)
+
+
+def summarize(wins, ties, samples):
+    '''
+    Turns win and tie counts over independent samples into an EquityResult.
+    '''
+    if samples == 0:
+        return EquityResult(0.5, 0.5, 0, 0., 0., 0.)
+    win = wins / samples
+    tie = ties / samples
+    mean = win + 0.5 * tie
+    if samples > 1:
+        # outcomes are 1, 0.5 or 0, so E[x^2] = win + tie / 4
+        variance = max(0., (win + 0.25 * tie - mean * mean) * samples / (samples - 1))
+        stderr = math.sqrt(variance / samples)
+    else:
+        stderr = 0.5
+    return EquityResult(mean, stderr, samples, win, tie, 1. - win - tie)
+
+
+def combination_count(my_hand, board, opp_known=None):
+    '''
+    The number of (opponent hand, runout) pairs an exact enumeration has to visit.
+    '''
+    unseen = 52 - len(my_hand) - len(board) - len(known_cards(opp_known))
+    opp_needed = 2 - len(known_cards(opp_known))
+    return math.comb(unseen, opp_needed) * math.comb(unseen - opp_needed, 5 - len(board))
+
+
+def equity(my_hand, board, opp_known=None, samples=300, deadline=None, rng=random, exact_budget=EXACT_BUDGET,
+           method='random'):
+    '''
+    Our share of the pot at showdown against a random opponent hand.
+    Enumerates exactly when that takes at most exact_budget showdowns
+    (the river, or the turn after a reveal), otherwise samples.
+    See monte_carlo_equity for the arguments.
+    '''
+    if combination_count(my_hand, board, opp_known) <= exact_budget:
+        return exact_equity(my_hand, board, opp_known)
+    return monte_carlo_equity(my_hand, board, opp_known, samples, deadline, rng, method)
+
+
+def exact_equity(my_hand, board, opp_known=None):
+    '''
+    Computes our share of the pot exactly, visiting every opponent hand and runout.
+    Each runout is scored for us once and then against every opponent hand it allows.
+    The returned stderr is 0 and samples is the number of showdowns visited.
+    '''
+    opp_known = known_cards(opp_known)
+    dead = set(my_hand) | set(board) | set(opp_known)
+    deck = to_cards([card for card in DECK if card not in dead])
+    hero = to_cards(my_hand)
+    villain = to_cards(opp_known)
+    board = to_cards(board)
+    opp_needed = 2 - len(villain)
+
+    evaluate = eval7.evaluate
+    wins = ties = count = 0
+    for runout in itertools.combinations(deck, 5 - len(board)):
+        full_board = board + list(runout)
+        mine = evaluate(hero + full_board)
+        rest = [card for card in deck if card not in runout]
+        for opp in itertools.combinations(rest, opp_needed):
+            theirs = evaluate(villain + list(opp) + full_board)
+            if mine > theirs:
+                wins += 1
+            elif mine == theirs:
+                ties += 1
+            count += 1
+    if count == 0:
+        return EquityResult(0.5, 0., 0, 0., 0., 0.)
+    win = wins / count
+    tie = ties / count
+    return EquityResult(win + 0.5 * tie, 0., count, win, tie, 1. - win - tie)
+
+
+def current_equity(hero, villain, board, deck):
+    '''
+    Our exact share of the pot if the hand ended on the current board, over every
+    opponent hand. All arguments are lists of eval7 Cards.
+    '''
+    evaluate = eval7.evaluate
+    mine = evaluate(hero + board)
+    total = count = 0
+    for opp in itertools.combinations(deck, 2 - len(villain)):
+        theirs = evaluate(villain + list(opp) + board)
+        total += 2 if mine > theirs else mine == theirs
+        count += 1
+    return total / (2 * count) if count else 0.5
+
+
+def _halton(index, base):
+    '''
+    The index-th element of the van der Corput sequence in the given base.
+    '''
+    value = 0.
+    scale = 1. / base
+    while index:
+        index, digit = divmod(index, base)
+        value += digit * scale
+        scale /= base
+    return value
+
+
+def _random_deals(deck, needed, rng):
+    sample = rng.sample
+    while True:
+        yield sample(deck, needed)
+
+
+def _stratified_deals(deck, needed, rng):
+    # the first card dealt visits every unseen card in turn, in a fresh random order per cycle
+    rests = {card: [other for other in deck if other is not card] for card in deck}
+    strata = list(deck)
+    sample = rng.sample
+    while True:
+        rng.shuffle(strata)
+        for card in strata:
+            yield [card] + sample(rests[card], needed - 1)
+
+
+def _halton_points(base, count):
+    '''
+    The first count elements of the van der Corput sequence in base, computed once and shared.
+    '''
+    points = _halton_cache.setdefault(base, [])
+    if len(points) < count:
+        points.extend(_halton(i, base) for i in range(len(points), count))
+    return points
+
+
+def _halton_deals(deck, needed, rng):
+    # a randomly shifted Halton point per deal, one dimension per card
+    bases = HALTON_BASES[:needed]
+    shifts = [rng.random() for _ in bases]
+    index = 0
+    while True:
+        dims = list(zip([_halton_points(base, index + 1024) for base in bases], shifts))
+        for index in range(index + 1, index + 1024):
+            remaining = list(deck)
+            drawn = []
+            for points, shift in dims:
+                u = (points[index] + shift) % 1.
+                drawn.append(remaining.pop(int(u * len(remaining))))
+            yield drawn
+
+
+DEALS = {'random': _random_deals, 'stratified': _stratified_deals, 'qmc': _halton_deals, 'control': _random_deals}
+
+
+def monte_carlo_equity(my_hand, board, opp_known=None, samples=300, deadline=None, rng=random, method='random'):
+    '''
+    Estimates our share of the pot at showdown against a random opponent hand
+    by Monte Carlo over the unseen cards.
+
+    Arguments:
+    my_hand: our two hole cards as strings.
+    board: the community cards dealt so far.
+    opp_known: the opponent's revealed card(s), e.g. current_state.opp_revealed_cards.
+    samples: the maximum number of runouts to simulate.
+    deadline: a pkbot.watchdog.Deadline; sampling stops early once it expires.
+              Defaults to the runner's decision deadline, if any.
+    rng: the random.Random instance to draw with.
+    method: how runouts are drawn, one of METHODS:
+            'random' draws them independently.
+            'stratified' deals every unseen card as the next card equally often.
+            'qmc' deals from a randomly shifted Halton sequence; the reported
+                  stderr is the plain one, which overstates its error.
+            'control' uses the result on the current board, whose mean is
+                  computed exactly, as a control variate.
+
+    Returns:
+    EquityResult(equity, stderr, samples, win, tie, loss) with equity in [0, 1].
+    '''
+    if method not in DEALS:
+        raise ValueError('Unknown sampling method {!r}, expected one of {}'.format(method, METHODS))
+    if deadline is None:
+        deadline = current_deadline()
+    opp_known = known_cards(opp_known)
+    dead = set(my_hand) | set(board) | set(opp_known)
+    deck = to_cards([card for card in DECK if card not in dead])
+    hero = to_cards(my_hand)
+    villain = to_cards(opp_known)
+    board = to_cards(board)
+    board_needed = 5 - len(board)
+    needed = board_needed + 2 - len(villain)
+    stratified = method == 'stratified'
+    control = method == 'control'
+    if control:
+        mine_now = eval7.evaluate(hero + board)
+        control_mean = current_equity(hero, villain, board, deck)
+        # sums of the control z, z^2, and its products with the win, tie and equity indicators
+        z_sum = zz_sum = zw_sum = zt_sum = 0.
+    strata = {}
+
+    evaluate = eval7.evaluate
+    deals = DEALS[method](deck, needed, rng)
+    wins = ties = done = 0
+    while done < samples:
+        if deadline is not None and done and deadline.expired():
+            break
+        for _ in range(min(CHECK_EVERY, samples - done)):
+            drawn = next(deals)
+            opp = villain + drawn[board_needed:]
+            full_board = board + drawn[:board_needed]
+            mine = evaluate(hero + full_board)
+            theirs = evaluate(opp + full_board)
+            win = mine > theirs
+            tie = mine == theirs
+            wins += win
+            ties += tie
+            done += 1
+            if stratified:
+                stratum = strata.setdefault(drawn[0], [0, 0.])
+                stratum[0] += 1
+                stratum[1] += win + 0.5 * tie
+            elif control:
+                theirs_now = evaluate(opp + board)
+                z = 1. if mine_now > theirs_now else 0.5 if mine_now == theirs_now else 0.
+                z_sum += z
+                zz_sum += z * z
+                zw_sum += z * win
+                zt_sum += z * tie
+    result = summarize(wins, ties, done)
+    if stratified and done > len(strata):
+        # pooled variance within strata; outcomes are 1, 0.5 or 0, so sum(y^2) = wins + ties / 4
+        within = wins + 0.25 * ties - sum(total * total / count for count, total in strata.values())
+        stderr = math.sqrt(max(0., within) / (done - len(strata)) / done)
+        result = result._replace(stderr=min(stderr, result.stderr))
+    elif control and done > 2:
+        z_mean = z_sum / done
+        z_var = zz_sum / done - z_mean * z_mean
+        if z_var > 0.:
+            # optimal coefficients, fitted per outcome so that equity = win + tie / 2 still holds
+            beta_win = (zw_sum / done - z_mean * result.win) / z_var
+            beta_tie = (zt_sum / done - z_mean * result.tie) / z_var
+            shift = z_mean - control_mean
+            win = result.win - beta_win * shift
+            tie = result.tie - beta_tie * shift
+            beta = beta_win + 0.5 * beta_tie
+            y_var = (result.stderr ** 2) * done
+            residual = max(0., y_var - beta * beta * z_var * done / (done - 1))
+            result = EquityResult(win + 0.5 * tie, math.sqrt(residual / done), done, win, tie, 1. - win - tie)
+    return result
@@ -0,0 +1,130 @@
+'''
+A pure-Python 5 to 7 card hand evaluator for where eval7 is not available.
+
+Cards are strings such as 'As'. The cards are folded into one bitmask with 13
+bits per suit, and the hand category comes from lookup tables over 13-bit rank
+masks, so no five-card subsets are enumerated. Hand values are encoded like
+eval7's (hand type in bits 24+, then up to five 4-bit rank nibbles), so they
+order hands exactly as eval7.evaluate does and compare directly with it.
+'''
+RANKS = '23456789TJQKA'
+SUITS = 'cdhs'
+
+HANDTYPE_SHIFT = 24
+HIGH_CARD, PAIR, TWO_PAIR, TRIPS, STRAIGHT, FLUSH, FULL_HOUSE, QUADS, STRAIGHT_FLUSH = range(9)
+HAND_TYPES = ['High Card', 'Pair', 'Two Pair', 'Trips', 'Straight', 'Flush', 'Full House', 'Quads', 'Straight Flush']
+
+CARD_MASK = {r + s: 1 << (13 * j + i) for i, r in enumerate(RANKS) for j, s in enumerate(SUITS)}
+
+_tables = None
+
+
+def build_tables():
+    '''
+    Returns (nbits, straight, top_card, top_five) lookup lists over 13-bit rank masks:
+    the number of ranks, the top rank of the best straight (0 if none; the wheel
+    counts as 3), the highest rank, and the top five ranks packed as nibbles.
+    '''
+    size = 1 << len(RANKS)
+    nbits = [bin(mask).count('1') for mask in range(size)]
+    top_card = [mask.bit_length() - 1 if mask else 0 for mask in range(size)]
+    straight = [0] * size
+    top_five = [0] * size
+    for mask in range(size):
+        for top in range(len(RANKS) - 1, 3, -1):
+            run = 0b11111 << (top - 4)
+            if mask & run == run:
+                straight[mask] = top
+                break
+        else:
+            wheel = 0b1000000001111
+            if mask & wheel == wheel:
+                straight[mask] = 3
+        value = 0
+        remaining = mask
+        for shift in (16, 12, 8, 4, 0):
+            if not remaining:
+                break
+            top = remaining.bit_length() - 1
+            value |= top << shift
+            remaining ^= 1 << top
+        top_five[mask] = value
+    return nbits, straight, top_card, top_five
+
+
+def tables():
+    '''
+    The lookup tables, built on first use.
+    '''
+    global _tables
+    if _tables is None:
+        _tables = build_tables()
+    return _tables
+
+
+def evaluate(cards):
+    '''
+    The value of the best five-card hand among 5 to 7 card strings; higher is better.
+    '''
+    nbits, straight, top_card, top_five = _tables or tables()
+    mask = 0
+    for card in cards:
+        mask |= CARD_MASK[card]
+    sc = mask & 0x1FFF
+    sd = (mask >> 13) & 0x1FFF
+    sh = (mask >> 26) & 0x1FFF
+    ss = mask >> 39
+    ranks = sc | sd | sh | ss
+    n_dups = len(cards) - nbits[ranks]
+
+    if n_dups < 3:
+        # with at most two duplicates a flush or straight beats anything else possible
+        for suit_mask in (sc, sd, sh, ss):
+            if nbits[suit_mask] >= 5:
+                if straight[suit_mask]:
+                    return (STRAIGHT_FLUSH << HANDTYPE_SHIFT) | (straight[suit_mask] << 16)
+                return (FLUSH << HANDTYPE_SHIFT) | top_five[suit_mask]
+        if straight[ranks]:
+            return (STRAIGHT << HANDTYPE_SHIFT) | (straight[ranks] << 16)
+
+    if n_dups == 0:
+        return top_five[ranks]
+
+    two_mask = ranks ^ (sc ^ sd ^ sh ^ ss)
+    if n_dups == 1:
+        return ((PAIR << HANDTYPE_SHIFT) | (top_card[two_mask] << 16)
+                | ((top_five[ranks ^ two_mask] >> 4) & ~0xF))
+
+    if n_dups == 2 and two_mask:
+        return ((TWO_PAIR << HANDTYPE_SHIFT) | (top_five[two_mask] & 0xFF000)
+                | (top_card[ranks ^ two_mask] << 8))
+
+    three_mask = ((sc & sd) | (sh & ss)) & ((sc & sh) | (sd & ss))
+    if n_dups == 2:
+        rest = ranks ^ three_mask
+        second = top_card[rest]
+        return ((TRIPS << HANDTYPE_SHIFT) | (top_card[three_mask] << 16) | (second << 12)
+                | (top_card[rest ^ (1 << second)] << 8))
+
+    four_mask = sc & sd & sh & ss
+    if four_mask:
+        top = top_card[four_mask]
+        return (QUADS << HANDTYPE_SHIFT) | (top << 16) | (top_card[ranks ^ (1 << top)] << 12)
+
+    if nbits[two_mask] != n_dups:
+        top = top_card[three_mask]
+        return ((FULL_HOUSE << HANDTYPE_SHIFT) | (top << 16)
+                | (top_card[(two_mask | three_mask) ^ (1 << top)] << 12))
+
+    # three pairs: the best two plus the best remaining card
+    top = top_card[two_mask]
+    second = top_card[two_mask ^ (1 << top)]
+    return ((TWO_PAIR << HANDTYPE_SHIFT) | (top << 16) | (second << 12)
+            | (top_card[ranks ^ (1 << top) ^ (1 << second)] << 8))
+
+
+def hand_type(value):
+    '''
+    The name of the hand type of a value returned by evaluate, e.g. 'Full House'.
+    '''
+    return HAND_TYPES[value >> HANDTYPE_SHIFT]
@@ -0,0 +1,151 @@
+'''
+Board texture and hand features from lookup tables over rank masks.
+
+Everything here works on 13-bit rank masks and per-suit counts, so a lookup
+costs a handful of table reads for any hole cards and board. Textures depend
+on the board alone and are memoized per suit-isomorphic board.
+'''
+from collections import namedtuple
+from .canonical import canonical_key
+from .equity import RANKS, SUITS
+from .evaluator import HAND_TYPES, HANDTYPE_SHIFT, PAIR, TWO_PAIR, evaluate, tables
+
+RANK_BIT = {r: 1 << i for i, r in enumerate(RANKS)}
+
+Texture = namedtuple('Texture', ['wetness', 'max_suit', 'paired', 'straight_ranks', 'gaps'])
+HandFeatures = namedtuple('HandFeatures', ['category', 'made', 'flush_draw', 'straight_draw', 'outs', 'texture'])
+
+_straight_ranks = None
+_textures = {}
+
+
+def straight_ranks_table():
+    '''
+    For every rank mask with no straight yet, the mask of ranks that would complete one.
+    Built on first use.
+    '''
+    global _straight_ranks
+    if _straight_ranks is None:
+        straight = tables()[1]
+        _straight_ranks = [0] * len(straight)
+        for mask in range(len(straight)):
+            if straight[mask]:
+                continue
+            completing = 0
+            for rank in range(len(RANKS)):
+                bit = 1 << rank
+                if not mask & bit and straight[mask | bit]:
+                    completing |= bit
+            _straight_ranks[mask] = completing
+    return _straight_ranks
+
+
+def masks(cards):
+    '''
+    Returns (rank mask, per-suit card counts) of card strings.
+    '''
+    ranks = 0
+    suits = [0] * len(SUITS)
+    for card in cards:
+        ranks |= RANK_BIT[card[0]]
+        suits[SUITS.index(card[1])] += 1
+    return ranks, suits
+
+
+def texture(board):
+    '''
+    The board's Texture: wetness 'dry', 'semi-wet' or 'wet' (as the bots classify it),
+    the most cards of one suit, whether a rank is paired, the mask of ranks that
+    would put a straight on the board, and the spread between its highest and
+    lowest rank.
+    '''
+    if len(board) < 3:
+        return Texture('dry', 0, False, 0, 0)
+    key = canonical_key((), board)
+    cached = _textures.get(key)
+    if cached is not None:
+        return cached
+    nbits, _, top_card, _ = tables()
+    ranks, suits = masks(board)
+    max_suit = max(suits)
+    low = (ranks & -ranks).bit_length() - 1
+    gaps = top_card[ranks] - low
+    if max_suit >= 3 or gaps <= 3:
+        wetness = 'wet'
+    elif max_suit == 2 or gaps <= 5:
+        wetness = 'semi-wet'
+    else:
+        wetness = 'dry'
+    result = Texture(wetness, max_suit, nbits[ranks] < len(board), straight_ranks_table()[ranks], gaps)
+    _textures[key] = result
+    return result
+
+
+def made_category(my_hand, board, value=None):
+    '''
+    A finer made-hand label: 'air', 'underpair', 'weak_pair', 'top_pair',
+    'overpair' or, for two pair and better, the hand type name in lower case.
+    value is our evaluate() value, if already known.
+    '''
+    if value is None:
+        value = evaluate(list(my_hand) + list(board))
+    handtype = value >> HANDTYPE_SHIFT
+    if handtype >= TWO_PAIR:
+        return HAND_TYPES[handtype].lower().replace(' ', '_')
+    top_card = tables()[2]
+    board_ranks, _ = masks(board)
+    board_top = top_card[board_ranks]
+    mine = [RANKS.index(card[0]) for card in my_hand]
+    if handtype == PAIR:
+        if mine[0] == mine[1]:
+            if mine[0] > board_top:
+                return 'overpair'
+            return 'underpair' if board_ranks and mine[0] < (board_ranks & -board_ranks).bit_length() - 1 else 'weak_pair'
+        if board_top in mine:
+            return 'top_pair'
+        if board_ranks & (RANK_BIT[my_hand[0][0]] | RANK_BIT[my_hand[1][0]]):
+            return 'weak_pair'
+    return 'air'
+
+
+def features(my_hand, board):
+    '''
+    Hand features for our hole cards on a board of 3 to 5 cards.
+
+    Returns HandFeatures(category, made, flush_draw, straight_draw, outs, texture):
+    category: the hand type index (see pkbot.evaluator.HAND_TYPES).
+    made: the made_category label.
+    flush_draw: True with four to a flush that uses one of our cards and more to come.
+    straight_draw: 'open' when two ranks complete a straight using our cards,
+                   'gutshot' when one does, else None.
+    outs: unseen cards that give us a straight or a flush we do not have yet.
+    texture: the board's Texture.
+    '''
+    value = evaluate(list(my_hand) + list(board))
+    category = value >> HANDTYPE_SHIFT
+    board_texture = texture(board)
+    nbits = tables()[0]
+    ranks, suits = masks(list(my_hand) + list(board))
+    more_to_come = len(board) < 5
+
+    flush_outs = 0
+    flush_suit = None
+    for s, count in enumerate(suits):
+        if count == 4 and more_to_come and any(card[1] == SUITS[s] for card in my_hand):
+            flush_suit = SUITS[s]
+            flush_outs = 13 - count
+
+    straight_draw = None
+    straight_outs = 0
+    if more_to_come:
+        # only ranks that complete a straight the board alone does not already offer
+        completing = straight_ranks_table()[ranks] & ~board_texture.straight_ranks
+        if completing and category < 4:
+            straight_draw = 'open' if nbits[completing] >= 2 else 'gutshot'
+            seen = list(my_hand) + list(board)
+            for rank in range(len(RANKS)):
+                if completing >> rank & 1:
+                    # four cards of the rank, less any we can see or that the flush outs already count
+                    straight_outs += sum(1 for suit in SUITS if RANKS[rank] + suit not in seen and suit != flush_suit)
+    return HandFeatures(category, made_category(my_hand, board, value), flush_suit is not None,
+                        straight_draw, flush_outs + straight_outs, board_texture)
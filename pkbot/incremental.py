@@ -0,0 +1,96 @@
+'''
+Per-hand equity that carries sampled runouts over from one street to the next.
+'''
+import random
+from .equity import (DECK, EXACT_BUDGET, CHECK_EVERY, DEALS, eval7, to_cards, known_cards, summarize,
+                     combination_count, exact_equity)
+from .watchdog import current_deadline
+
+
+class HandEquity():
+    '''
+    Equity for one hand, reusing earlier streets' samples on later streets.
+
+    Every sampled showdown is kept with the full board and opponent hand it was
+    played on, indexed by each board prefix it extends. A flop sample whose turn
+    card is the one actually dealt is a valid sample of the turn, so on later
+    streets the matching samples are reused and only the shortfall is drawn;
+    samples that contradict a revealed opponent card are skipped. Exact results
+    (the river) are computed once per board. Create one in on_hand_start and
+    drop it in on_hand_end. Sampling more on the flop, e.g. while pondering,
+    makes the turn nearly free.
+    '''
+
+    def __init__(self, my_hand, rng=random, method='random', exact_budget=EXACT_BUDGET):
+        self.my_hand = list(my_hand)
+        self.rng = rng
+        self.method = method
+        self.exact_budget = exact_budget
+        # board prefix -> [(opponent hand, outcome)], outcome 2 for a win, 1 for a tie, 0 for a loss
+        self.samples = {}
+        self.exact = {}
+        self.reused = 0
+        self.drawn = 0
+
+    def equity(self, board, opp_known=None, samples=300, deadline=None):
+        '''
+        Same as pkbot.equity.equity for this hand's hole cards.
+        '''
+        opp_known = known_cards(opp_known)
+        if combination_count(self.my_hand, board, opp_known) <= self.exact_budget:
+            key = (tuple(board), tuple(opp_known))
+            if key not in self.exact:
+                self.exact[key] = exact_equity(self.my_hand, board, opp_known)
+            return self.exact[key]
+
+        board = to_cards(board)
+        villain = to_cards(opp_known)
+        wins = ties = count = 0
+        for opp, outcome in self.samples.get(tuple(board), ()):
+            if all(card in opp for card in villain):
+                wins += outcome == 2
+                ties += outcome == 1
+                count += 1
+        self.reused += count
+        if count < samples:
+            new_wins, new_ties, new_count = self._draw(board, villain, samples - count, deadline)
+            wins += new_wins
+            ties += new_ties
+            count += new_count
+        return summarize(wins, ties, count)
+
+    def _draw(self, board, villain, samples, deadline):
+        '''
+        Samples showdowns for the given situation and stores them under every board prefix.
+        '''
+        if deadline is None:
+            deadline = current_deadline()
+        dead = set(to_cards(self.my_hand)) | set(board) | set(villain)
+        deck = [card for card in to_cards(DECK) if card not in dead]
+        hero = to_cards(self.my_hand)
+        board_needed = 5 - len(board)
+        needed = board_needed + 2 - len(villain)
+        stored = self.samples.setdefault(tuple(board), [])
+
+        evaluate = eval7.evaluate
+        deals = DEALS[self.method](deck, needed, self.rng)
+        wins = ties = done = 0
+        while done < samples:
+            if deadline is not None and done and deadline.expired():
+                break
+            for _ in range(min(CHECK_EVERY, samples - done)):
+                drawn = next(deals)
+                opp = villain + drawn[board_needed:]
+                full_board = board + drawn[:board_needed]
+                mine = evaluate(hero + full_board)
+                theirs = evaluate(opp + full_board)
+                outcome = 2 if mine > theirs else 1 if mine == theirs else 0
+                wins += outcome == 2
+                ties += outcome == 1
+                done += 1
+                record = (tuple(opp), outcome)
+                stored.append(record)
+                for length in range(len(board) + 1, 6):
+                    self.samples.setdefault(tuple(full_board[:length]), []).append(record)
+        self.drawn += done
+        return wins, ties, done
@@ -0,0 +1,72 @@
+'''
+Detects when thinking about a decision can no longer change the match result.
+'''
+from .states import NUM_ROUNDS, BIG_BLIND, SMALL_BLIND, STARTING_STACK
+from .watchdog import safe_action
+
+
+def max_fold_loss(hands_left):
+    '''
+    The most we can lose over hands_left hands by checking or folding every one.
+    Blinds alternate, so that is at most ceil(n/2) big blinds and floor(n/2) small blinds.
+    '''
+    return (hands_left + 1) // 2 * BIG_BLIND + hands_left // 2 * SMALL_BLIND
+
+
+def is_locked_in(game_info, current_state=None):
+    '''
+    True if we win the match even by checking or folding from here on.
+    With current_state, the chips already committed this hand are counted as lost;
+    without it, the current hand is assumed to cost a big blind.
+    '''
+    hands_left = NUM_ROUNDS - game_info.round_num
+    at_risk = STARTING_STACK - current_state.my_chips if current_state is not None else BIG_BLIND
+    return game_info.bankroll > max_fold_loss(hands_left) + at_risk
+
+
+def is_time_critical(game_info, reserve=1.0, seconds_per_hand=0.002):
+    '''
+    True if the time bank is too low to keep computing: less than reserve seconds
+    plus seconds_per_hand for each hand still to be played.
+    '''
+    hands_left = NUM_ROUNDS - game_info.round_num + 1
+    return game_info.time_bank < reserve + hands_left * seconds_per_hand
+
+
+class LockIn():
+    '''
+    Answers with a safe action instead of calling get_move once the match is
+    decided or the time bank is nearly gone.
+    '''
+
+    def __init__(self, reserve=1.0, seconds_per_hand=0.002):
+        self.reserve = reserve
+        self.seconds_per_hand = seconds_per_hand
+        self.skipped = 0
+        self.reason = None
+
+    def check(self, game_info, current_state):
+        '''
+        Returns why get_move should be skipped ('locked in' or 'time critical'), or None.
+        '''
+        if is_locked_in(game_info, current_state):
+            return 'locked in'
+        if is_time_critical(game_info, self.reserve, self.seconds_per_hand):
+            return 'time critical'
+        return None
+
+    def wrap(self, get_move):
+        '''
+        Returns get_move guarded by the lock-in check.
+        '''
+        def guarded(game_info, current_state):
+            reason = self.check(game_info, current_state)
+            if reason is None:
+                return get_move(game_info, current_state)
+            if reason != self.reason:
+                print('Round {}: {} (bankroll {}, time bank {:.3f}s), playing safe'.format(
+                    game_info.round_num, reason, game_info.bankroll, game_info.time_bank))
+                self.reason = reason
+            self.skipped += 1
+            return safe_action(current_state)
+        return guarded
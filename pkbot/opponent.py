@@ -0,0 +1,173 @@
+'''
+Opponent statistics gathered from the engine's messages and kept across matches.
+'''
+import json
+import os
+from .preflop import class_name, hand_class
+from .states import GameState, BIG_BLIND, STARTING_STACK
+
+STREETS = ('pre-flop', 'flop', 'turn', 'river')
+# upper edges of the bid histogram buckets, as fractions of the pot; the last bucket is open
+BID_EDGES = (0., 0.1, 0.25, 0.5, 1., 2., 4.)
+
+
+class OpponentStats():
+    '''
+    Counts of what the opponent does, updated in constant time per engine clause.
+
+    Give your bot one as self.observer and the Runner feeds it every clause:
+    hands played, VPIP and preflop raises, how often they fold when bet into
+    on each street, their auction bids (from the N clause) and the hands they
+    show down (from the O clause). Memory is fixed: only counters and fixed
+    histograms are kept. With a path, the stats of the named opponent are loaded
+    from that JSON file on creation and written back when the match ends, so the
+    next match against the same name starts warm. Given a pkbot.bidding.BidModel
+    as bids, it is fed every opponent bid and saved along with the counts.
+    '''
+
+    def __init__(self, name='opponent', path=None, bids=None):
+        self.name = name
+        self.path = path
+        self.bids_model = bids
+        self.hands = 0
+        self.vpip_hands = 0
+        self.pfr_hands = 0
+        self.faced = dict.fromkeys(STREETS, 0)
+        self.folded = dict.fromkeys(STREETS, 0)
+        self.bids = 0
+        self.bid_total = 0
+        self.bid_squares = 0
+        self.bid_histogram = [0] * len(BID_EDGES)
+        self.showdowns = 0
+        self.shown = {}
+        self._vpip = self._pfr = False
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def observe(self, clause, previous, state, active):
+        '''
+        Updates the counts from one engine clause. previous and state are the
+        game states before and after it, active is our seat.
+        '''
+        kind = clause[0]
+        opponent = 1 - active
+        if kind == 'H':
+            self.hands += 1
+            self._vpip = self._pfr = False
+        elif kind in 'FCKR' and isinstance(previous, GameState) and previous.dealer % 2 == opponent:
+            street = previous.get_street_name()
+            cost = previous.wagers[active] - previous.wagers[opponent]
+            # preflop, only a raise over the big blind counts as a bet
+            if cost > 0 and (street != 'pre-flop' or previous.wagers[active] > BIG_BLIND):
+                self.faced[street] += 1
+                self.folded[street] += kind == 'F'
+            if street == 'pre-flop' and kind in 'CR' and not self._vpip:
+                self._vpip = True
+                self.vpip_hands += 1
+            if street == 'pre-flop' and kind == 'R' and not self._pfr:
+                self._pfr = True
+                self.pfr_hands += 1
+        elif kind == 'N' and isinstance(previous, GameState):
+            bid = state.bids[opponent]
+            pot = 2 * STARTING_STACK - sum(previous.chips)
+            self.bids += 1
+            self.bid_total += bid
+            self.bid_squares += bid * bid
+            bucket = sum(bid > edge * pot for edge in BID_EDGES[1:])
+            self.bid_histogram[bucket] += 1
+            if self.bids_model is not None:
+                self.bids_model.observe(bid, pot, previous.community_cards)
+        elif kind == 'O':
+            name = class_name(hand_class(clause[1:].split(',')))
+            self.showdowns += 1
+            self.shown[name] = self.shown.get(name, 0) + 1
+
+    def close(self):
+        '''
+        Called by the Runner when the match ends; saves the stats if a path was given.
+        '''
+        if self.path is not None:
+            self.save(self.path)
+
+    def vpip(self):
+        '''
+        The fraction of hands in which the opponent voluntarily put chips in preflop.
+        '''
+        return self.vpip_hands / self.hands if self.hands else 0.
+
+    def pfr(self):
+        '''
+        The fraction of hands in which the opponent raised preflop.
+        '''
+        return self.pfr_hands / self.hands if self.hands else 0.
+
+    def fold_to_bet(self, street):
+        '''
+        How often the opponent folded when facing a bet or raise on street, or None if never seen.
+        '''
+        return self.folded[street] / self.faced[street] if self.faced[street] else None
+
+    def bid_mean(self):
+        return self.bid_total / self.bids if self.bids else 0.
+
+    def bid_std(self):
+        if self.bids < 2:
+            return 0.
+        mean = self.bid_mean()
+        return max(0., self.bid_squares / self.bids - mean * mean) ** 0.5
+
+    def to_dict(self):
+        stats = {
+            'hands': self.hands, 'vpip': self.vpip_hands, 'pfr': self.pfr_hands,
+            'faced': self.faced, 'folded': self.folded,
+            'bids': [self.bids, self.bid_total, self.bid_squares], 'bid_histogram': self.bid_histogram,
+            'showdowns': self.showdowns, 'shown': self.shown,
+        }
+        if self.bids_model is not None:
+            stats['bid_model'] = self.bids_model.to_dict()
+        return stats
+
+    def update(self, stats):
+        '''
+        Adds counts in the to_dict format, e.g. from an earlier match.
+        '''
+        self.hands += stats['hands']
+        self.vpip_hands += stats['vpip']
+        self.pfr_hands += stats['pfr']
+        for street in STREETS:
+            self.faced[street] += stats['faced'].get(street, 0)
+            self.folded[street] += stats['folded'].get(street, 0)
+        bids, total, squares = stats['bids']
+        self.bids += bids
+        self.bid_total += total
+        self.bid_squares += squares
+        for bucket, count in enumerate(stats['bid_histogram'][:len(BID_EDGES)]):
+            self.bid_histogram[bucket] += count
+        self.showdowns += stats['showdowns']
+        for name, count in stats['shown'].items():
+            self.shown[name] = self.shown.get(name, 0) + count
+        if self.bids_model is not None and 'bid_model' in stats:
+            self.bids_model.update(stats['bid_model'])
+
+    def load(self, path):
+        '''
+        Adds the stats saved under this opponent's name in path, if any.
+        '''
+        with open(path) as stats_file:
+            saved = json.load(stats_file)
+        if self.name in saved:
+            self.update(saved[self.name])
+
+    def save(self, path):
+        '''
+        Writes the stats under this opponent's name in path, keeping other opponents' entries.
+        '''
+        saved = {}
+        if os.path.exists(path):
+            with open(path) as stats_file:
+                saved = json.load(stats_file)
+        saved[self.name] = self.to_dict()
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as stats_file:
+            json.dump(saved, stats_file, separators=(',', ':'))
+        os.replace(tmp_path, path)
@@ -0,0 +1,42 @@
+'''
+Tunable bot constants, kept in a JSON file next to the bot.
+
+A bot declares its constants as a module-level PARAMS dict of defaults and
+reads them with load_params; tune.py writes the best values it finds with
+save_params. Without a file the defaults are used unchanged.
+'''
+import json
+import os
+
+
+def params_path(bot_file):
+    '''
+    The parameter file of a bot, e.g. bot4.params.json for bot4.py.
+    '''
+    return os.path.splitext(os.path.abspath(bot_file))[0] + '.params.json'
+
+
+def load_params(defaults, path=None):
+    '''
+    Returns a copy of defaults with the values saved in path, if it exists.
+    Saved values are cast to the type of their default; names that are not
+    in defaults are ignored, so an old file never breaks a bot.
+    '''
+    params = dict(defaults)
+    if path is None or not os.path.exists(path):
+        return params
+    with open(path) as params_file:
+        saved = json.load(params_file)
+    for name, value in saved.items():
+        if name in params:
+            params[name] = type(defaults[name])(value)
+    return params
+
+
+def save_params(params, path):
+    '''
+    Writes params to path as JSON.
+    '''
+    with open(path, 'w') as params_file:
+        json.dump(params, params_file, indent=2, sort_keys=True)
+        params_file.write('\n')
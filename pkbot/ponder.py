@@ -0,0 +1,128 @@
+'''
+Speculative computation while the bot waits for the engine.
+'''
+import threading
+from collections import OrderedDict
+
+
+class Ponderer():
+    '''
+    Runs speculative tasks on a background thread while the bot is idle.
+
+    Tasks are submitted under a hashable key and their results are cached,
+    so get_move can pick up anything computed while the opponent was thinking.
+    The Runner pauses the worker as soon as an engine message arrives and
+    resumes it once our reply is sent. A task that is already running is
+    allowed to finish, so tasks should be kept small (a few ms each).
+    '''
+
+    def __init__(self, max_results=256):
+        self.max_results = max_results
+        self.results = OrderedDict()
+        self.pending = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._cond = threading.Condition()
+        self._paused = True
+        self._stopped = False
+        self._running = None
+        self._thread = threading.Thread(target=self._work, daemon=True)
+        self._thread.start()
+
+    def submit(self, key, func, *args):
+        '''
+        Queues func(*args) to be computed in the background under key.
+        Does nothing if the key is already cached, queued or running.
+        '''
+        with self._cond:
+            if key in self.results or key in self.pending or key == self._running:
+                return
+            self.pending[key] = (func, args)
+            self._cond.notify_all()
+
+    def get(self, key, func, *args):
+        '''
+        Returns the cached result for key, computing func(*args) inline on a miss.
+        If the worker is computing key right now, waits for it instead.
+        '''
+        with self._cond:
+            while self._running == key:
+                self._cond.wait()
+            if key in self.results:
+                self.hits += 1
+                self.results.move_to_end(key)
+                return self.results[key]
+            self.pending.pop(key, None)
+            self.misses += 1
+        result = func(*args)
+        with self._cond:
+            self._store(key, result)
+        return result
+
+    def peek(self, key, default=None):
+        '''
+        Returns the cached result for key without computing anything.
+        '''
+        with self._cond:
+            return self.results.get(key, default)
+
+    def clear(self):
+        '''
+        Drops all queued tasks and cached results.
+        '''
+        with self._cond:
+            self.pending.clear()
+            self.results.clear()
+
+    def pause(self):
+        '''
+        Stops the worker from starting new tasks.
+        '''
+        with self._cond:
+            self._paused = True
+
+    def resume(self):
+        '''
+        Lets the worker start on queued tasks again.
+        '''
+        with self._cond:
+            self._paused = False
+            self._cond.notify_all()
+
+    def stop(self):
+        '''
+        Shuts the worker down. Queued tasks are discarded.
+        '''
+        with self._cond:
+            self._stopped = True
+            self.pending.clear()
+            self._cond.notify_all()
+
+    def _store(self, key, result):
+        self.results[key] = result
+        self.results.move_to_end(key)
+        while len(self.results) > self.max_results:
+            self.results.popitem(last=False)
+
+    def _work(self):
+        with self._cond:
+            while True:
+                while not self._stopped and (self._paused or not self.pending):
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                key, (func, args) = self.pending.popitem(last=False)
+                self._running = key
+                self._cond.release()
+                try:
+                    result = func(*args)
+                    failed = False
+                except Exception:
+                    # a failed task is simply recomputed inline by get()
+                    failed = True
+                finally:
+                    self._cond.acquire()
+                self._running = None
+                if not failed:
+                    self._store(key, result)
+                self._cond.notify_all()
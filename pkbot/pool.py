@@ -0,0 +1,200 @@
+'''
+A pool of persistent worker processes that split large equity queries.
+'''
+import multiprocessing
+import os
+import random
+from .cache import merge
+from .equity import DECK, EXACT_BUDGET, EquityResult, to_cards, known_cards, combination_count, equity, monte_carlo_equity
+from .watchdog import Deadline, current_deadline
+
+# below this many samples a query is answered in-process; a round trip to the
+# workers costs about as much as 50 samples
+MIN_SAMPLES = 500
+# seconds kept back from the deadline for sending results back
+RETURN_MARGIN = 0.002
+# seconds the pool waits at creation for each worker to be ready
+STARTUP_TIMEOUT = 5.
+
+
+def _serve(conn):
+    '''
+    Worker loop: says it is ready, then answers monte_carlo_equity requests until it receives None.
+    '''
+    to_cards(DECK)
+    try:
+        conn.send(())
+    except (BrokenPipeError, OSError):
+        return
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        my_hand, board, opp_known, samples, seed, budget, method = request
+        deadline = Deadline(budget) if budget is not None else None
+        result = monte_carlo_equity(my_hand, board, opp_known, samples, deadline, random.Random(seed), method)
+        conn.send(tuple(result))
+
+
+class EquityPool():
+    '''
+    Splits Monte Carlo equity queries across persistent worker processes.
+
+    Workers are started once, when the pool is created, and talk to the bot over
+    pipes. A query with at least min_samples samples is divided evenly between
+    the workers and the bot's own process, each drawing with its own seed, and
+    the partial results are merged. Smaller queries, and exact enumerations,
+    run in-process. A worker that misses the deadline is left out of the result
+    and skipped until it has answered.
+
+    Workers are started from a forkserver where available: the bot may already
+    run threads (a Ponderer, the runner's watchdog) whose locks a plain fork
+    would copy mid-use, while the forkserver is a fresh single-threaded process
+    that imports this module once, so each worker starts with eval7 and the
+    evaluators loaded. A worker that has died is restarted, and its share of
+    the query is drawn in-process instead.
+    '''
+
+    def __init__(self, workers=None, min_samples=MIN_SAMPLES, seed=None):
+        if workers is None:
+            workers = max(0, (os.cpu_count() or 1) - 1)
+        self.min_samples = min_samples
+        self.rng = random.Random(seed)
+        if 'forkserver' in multiprocessing.get_all_start_methods():
+            self.context = multiprocessing.get_context('forkserver')
+            self.context.set_forkserver_preload([__name__])
+        else:
+            self.context = multiprocessing.get_context()
+        self.connections = []
+        self.processes = []
+        # workers still busy with a request from an earlier query
+        self.busy = set()
+        self.split = 0
+        self.local = 0
+        self.restarts = 0
+        for _ in range(workers):
+            self.connections.append(None)
+            self.processes.append(None)
+            self._start(len(self.connections) - 1)
+        # pay for starting the workers here rather than in the first query
+        for conn in list(self.connections):
+            self._ready(conn, STARTUP_TIMEOUT)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def equity(self, my_hand, board, opp_known=None, samples=300, deadline=None, method='random'):
+        '''
+        Same as pkbot.equity.equity, with large Monte Carlo queries spread over the workers.
+        '''
+        if deadline is None:
+            deadline = current_deadline()
+        opp_known = known_cards(opp_known)
+        idle = [conn for conn in list(self.connections) if self._ready(conn)]
+        if (not idle or samples < self.min_samples
+                or combination_count(my_hand, board, opp_known) <= EXACT_BUDGET):
+            self.local += 1
+            return equity(my_hand, board, opp_known, samples, deadline, self.rng, method=method)
+
+        shares = len(idle) + 1
+        budget = max(0., deadline.remaining() - RETURN_MARGIN) if deadline is not None else None
+        own = samples // shares
+        sent = []
+        for n, conn in enumerate(idle):
+            count = samples // shares + (n < samples % shares)
+            try:
+                conn.send((my_hand, board, opp_known, count, self.rng.getrandbits(64), budget, method))
+            except (BrokenPipeError, EOFError, OSError):
+                self._restart(conn)
+                own += count
+                continue
+            self.busy.add(conn)
+            sent.append(conn)
+        if not sent:
+            self.local += 1
+            return equity(my_hand, board, opp_known, samples, deadline, self.rng, method=method)
+
+        self.split += 1
+        result = monte_carlo_equity(my_hand, board, opp_known, own, deadline,
+                                    random.Random(self.rng.getrandbits(64)), method)
+        for conn in sent:
+            timeout = deadline.remaining() + RETURN_MARGIN if deadline is not None else None
+            try:
+                if conn.poll(timeout):
+                    result = merge(result, self._receive(conn))
+            except (BrokenPipeError, EOFError, OSError):
+                # died with our request; its share is left out like a late answer
+                self._restart(conn)
+        return result
+
+    def _start(self, n):
+        '''
+        Starts worker n, replacing its connection and process. It counts as busy
+        until it has said it is ready.
+        '''
+        parent_conn, child_conn = self.context.Pipe()
+        process = self.context.Process(target=_serve, args=(child_conn,), daemon=True)
+        process.start()
+        child_conn.close()
+        self.connections[n] = parent_conn
+        self.processes[n] = process
+        self.busy.add(parent_conn)
+
+    def _restart(self, conn):
+        '''
+        Replaces the dead worker behind conn with a fresh one.
+        '''
+        n = self.connections.index(conn)
+        self.busy.discard(conn)
+        conn.close()
+        process = self.processes[n]
+        if process.is_alive():
+            process.terminate()
+        process.join(timeout=1.)
+        self.restarts += 1
+        self._start(n)
+
+    def _receive(self, conn):
+        self.busy.discard(conn)
+        return EquityResult(*conn.recv())
+
+    def _ready(self, conn, timeout=0.):
+        '''
+        True if the worker has no request outstanding, collecting a late answer (or
+        its ready message) if there is one within timeout seconds. A worker found
+        dead is restarted and left out of this query.
+        '''
+        if conn not in self.busy:
+            return True
+        try:
+            if conn.poll(timeout):
+                self.busy.discard(conn)
+                conn.recv()
+                return True
+        except (BrokenPipeError, EOFError, OSError):
+            self._restart(conn)
+        return False
+
+    def close(self):
+        '''
+        Stops the workers.
+        '''
+        for conn in self.connections:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            conn.close()
+        for process in self.processes:
+            process.join(timeout=1.)
+            if process.is_alive():
+                process.terminate()
+        self.connections = []
+        self.processes = []
+        self.busy.clear()
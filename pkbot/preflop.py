@@ -0,0 +1,147 @@
+'''
+Precomputed preflop equities for the 169 canonical starting hands.
+
+The table is built offline by gen_preflop_tables.py and memory-mapped on first use.
+'''
+import math
+import os
+import struct
+from .startup import MappedTable
+from .equity import RANKS, SUITS, DECK, known_cards, equity
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'preflop.bin')
+
+# header: magic, format version, number of boards sampled
+HEADER = struct.Struct('<4sIQ')
+MAGIC = b'PKPF'
+VERSION = 1
+
+NUM_CLASSES = 169
+# relation of a revealed card's suit to our hand: suit of our first card, of our second, or neither
+NUM_RELATIONS = 3
+
+# offsets (in floats) of the three sections of the table
+VS_RANDOM = 0
+VS_REVEALED = VS_RANDOM + NUM_CLASSES
+MATCHUPS = VS_REVEALED + NUM_CLASSES * len(RANKS) * NUM_RELATIONS
+TABLE_SIZE = MATCHUPS + NUM_CLASSES * NUM_CLASSES
+
+# every two-card combo, each ordered high rank first (higher suit first for pairs)
+COMBOS = []
+for _i, _a in enumerate(DECK):
+    for _b in DECK[_i + 1:]:
+        COMBOS.append((_b, _a))
+del _i, _a, _b
+
+_table = MappedTable(TABLE_PATH, 'f', HEADER.size)
+
+
+def order(hand):
+    '''
+    Returns the two hole cards high rank first, or higher suit first for a pair.
+    '''
+    a, b = hand
+    ra, rb = RANKS.index(a[0]), RANKS.index(b[0])
+    if ra < rb or (ra == rb and SUITS.index(a[1]) < SUITS.index(b[1])):
+        return b, a
+    return a, b
+
+
+def hand_class(hand):
+    '''
+    The canonical class (0-168) of two hole cards, as a cell of the 13x13 grid:
+    row = high rank, column = low rank for suited hands, swapped for offsuit.
+    '''
+    a, b = order(hand)
+    high, low = RANKS.index(a[0]), RANKS.index(b[0])
+    if a[1] == b[1]:
+        return high * 13 + low
+    return low * 13 + high
+
+
+def class_name(index):
+    '''
+    The usual name of a hand class, e.g. 'AKs', 'QJo' or '77'.
+    '''
+    row, col = divmod(index, 13)
+    if row == col:
+        return RANKS[row] * 2
+    if row > col:
+        return RANKS[row] + RANKS[col] + 's'
+    return RANKS[col] + RANKS[row] + 'o'
+
+
+def relation(hand, card):
+    '''
+    How card's suit relates to our (ordered) hand: 0 matches the first card,
+    1 matches only the second, 2 matches neither.
+    '''
+    a, b = order(hand)
+    if card[1] == a[1]:
+        return 0
+    if card[1] == b[1]:
+        return 1
+    return 2
+
+
+def revealed_index(hand, card):
+    '''
+    Position of (our class, revealed card) in the vs-revealed section.
+    '''
+    return VS_REVEALED + (hand_class(hand) * len(RANKS) + RANKS.index(card[0])) * NUM_RELATIONS + relation(hand, card)
+
+
+def table_available():
+    '''
+    True if the precomputed table file exists.
+    '''
+    return _table.loaded or os.path.exists(TABLE_PATH)
+
+
+def table_boards():
+    '''
+    The number of boards sampled when the table was built.
+    '''
+    magic, version, boards = HEADER.unpack(_table.header())
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('{} is not a version {} preflop table'.format(TABLE_PATH, VERSION))
+    return boards
+
+
+def preflop_equity(my_hand, opp_known=None, samples=300):
+    '''
+    Our preflop equity against a random hand, or against a hand known to hold
+    the revealed card opp_known, in O(1) from the table. Falls back to Monte
+    Carlo with the given number of samples if the table has not been built.
+    '''
+    opp_known = known_cards(opp_known)
+    if not table_available():
+        return equity(my_hand, [], opp_known, samples).equity
+    if not opp_known:
+        return _table[VS_RANDOM + hand_class(my_hand)]
+    value = _table[revealed_index(my_hand, opp_known[0])]
+    if math.isnan(value):
+        raise ValueError('{} cannot be revealed against {}'.format(opp_known[0], my_hand))
+    return value
+
+
+def preflop_matchup(my_hand, opp_hand, samples=300):
+    '''
+    Equity of our hand class against the opponent's hand class, averaged over
+    suit combinations. Falls back to Monte Carlo if the table has not been built.
+    '''
+    if not table_available():
+        return equity(my_hand, [], opp_hand, samples).equity
+    return _table[MATCHUPS + hand_class(my_hand) * NUM_CLASSES + hand_class(opp_hand)]
+
+
+def matchup_row(my_hand):
+    '''
+    Equities of our hand class against each of the 169 classes, as a memoryview
+    into the table (suit-averaged like preflop_matchup), or None if the table
+    has not been built.
+    '''
+    if not table_available():
+        return None
+    start = MATCHUPS + hand_class(my_hand) * NUM_CLASSES
+    return _table.view[start:start + NUM_CLASSES]
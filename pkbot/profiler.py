@@ -0,0 +1,94 @@
+'''
+Opt-in timing and profiling of the pokerbot's callbacks.
+'''
+import cProfile
+import os
+import time
+from collections import namedtuple
+
+DecisionTiming = namedtuple('DecisionTiming', ['kind', 'round_num', 'street', 'action', 'seconds'])
+
+
+class DecisionProfiler():
+    '''
+    Times every pokerbot callback and keeps a cProfile snapshot of the slow ones.
+
+    Each call runs under cProfile, which roughly doubles the cost of pure-Python
+    code, but the stats are only written to disk when the call took longer than
+    threshold seconds. The Runner only wraps the callbacks when profiling is on,
+    so a disabled profiler costs nothing.
+    '''
+
+    def __init__(self, path, threshold=0.1):
+        self.path = path
+        self.threshold = threshold
+        self.timings = []
+        self.snapshots = []
+        # the round being played and the number of calls recorded in it so far
+        self.round_num = None
+        self.round_calls = 0
+
+    def wrap(self, kind, func):
+        '''
+        Returns func wrapped so that each call is timed and recorded under kind.
+        func must take (game_info, current_state) like the BaseBot callbacks.
+        '''
+        def profiled(game_info, current_state):
+            profile = cProfile.Profile()
+            start = time.perf_counter()
+            profile.enable()
+            try:
+                result = func(game_info, current_state)
+            finally:
+                profile.disable()
+                seconds = time.perf_counter() - start
+            action = type(result).__name__ if result is not None else ''
+            self.record(kind, game_info.round_num, current_state.street, action, seconds, profile)
+            return result
+        return profiled
+
+    def record(self, kind, round_num, street, action, seconds, profile=None):
+        '''
+        Stores one timing, dumping the profile if the call was slow. Snapshots are
+        named by round, the call's position in the round, street and kind, so two
+        slow calls on the same street keep a file each.
+        '''
+        if round_num != self.round_num:
+            self.round_num = round_num
+            self.round_calls = 0
+        self.round_calls += 1
+        self.timings.append(DecisionTiming(kind, round_num, street, action, seconds))
+        if profile is not None and seconds > self.threshold:
+            name = '{}.r{}.{}.{}.{}.prof'.format(os.path.splitext(self.path)[0], round_num, self.round_calls, street, kind)
+            profile.dump_stats(name)
+            self.snapshots.append(name)
+
+    def summary(self, slowest=10):
+        '''
+        Returns a compact text report of the recorded timings.
+        '''
+        groups = {}
+        for timing in self.timings:
+            groups.setdefault((timing.kind, timing.street, timing.action), []).append(timing.seconds)
+        lines = ['{:<14}{:<10}{:<13}{:>7}{:>10}{:>10}{:>10}{:>10}'.format(
+            'call', 'street', 'action', 'count', 'total', 'mean', 'p95', 'max')]
+        for (kind, street, action), seconds in sorted(groups.items()):
+            seconds.sort()
+            p95 = seconds[min(len(seconds) - 1, int(0.95 * len(seconds)))]
+            lines.append('{:<14}{:<10}{:<13}{:>7}{:>10.4f}{:>10.5f}{:>10.5f}{:>10.5f}'.format(
+                kind, street, action, len(seconds), sum(seconds), sum(seconds) / len(seconds), p95, seconds[-1]))
+        lines.append('')
+        lines.append('total {:.4f}s over {} calls, {} snapshots above {}s'.format(
+            sum(t.seconds for t in self.timings), len(self.timings), len(self.snapshots), self.threshold))
+        lines.append('slowest:')
+        for timing in sorted(self.timings, key=lambda t: t.seconds, reverse=True)[:slowest]:
+            lines.append('  {:.5f}s round {} {} {} {}'.format(
+                timing.seconds, timing.round_num, timing.kind, timing.street, timing.action))
+        return '\n'.join(lines) + '\n'
+
+    def write_summary(self):
+        '''
+        Writes the summary report to self.path.
+        '''
+        with open(self.path, 'w') as summary_file:
+            summary_file.write(self.summary())
@@ -0,0 +1,331 @@
+'''
+Opponent ranges as weights over all 1326 two-card combos.
+'''
+import itertools
+import math
+import random
+import numpy as np
+from .actions import ActionCall, ActionCheck, ActionRaise
+from .batch import CARD_INDEX, evaluate_batch, evaluate_flushes, evaluate_rank_counts
+from .equity import DECK
+from .preflop import COMBOS, hand_class, matchup_row, preflop_equity
+
+# runouts sampled per query where runouts are not enumerated
+RUNOUTS = 32
+
+# (1326, 2) card indices of COMBOS, which combos hold each card, and the index of each combo
+COMBO_CARDS = np.array([[CARD_INDEX[a], CARD_INDEX[b]] for a, b in COMBOS], dtype=np.int64)
+HOLDS = np.zeros((len(COMBOS), len(DECK)), dtype=bool)
+HOLDS[np.arange(len(COMBOS)), COMBO_CARDS[:, 0]] = True
+HOLDS[np.arange(len(COMBOS)), COMBO_CARDS[:, 1]] = True
+COMBO_INDEX = {}
+for _n, (_a, _b) in enumerate(COMBOS):
+    COMBO_INDEX[_a, _b] = COMBO_INDEX[_b, _a] = _n
+del _n, _a, _b
+CLASSES = np.array([hand_class(combo) for combo in COMBOS])
+
+_preflop_strength = None
+
+
+def blocked(cards):
+    '''
+    Boolean mask of the combos that share a card with cards.
+    '''
+    if not len(cards):
+        return np.zeros(len(COMBOS), dtype=bool)
+    return HOLDS[:, [CARD_INDEX[card] for card in cards]].any(axis=1)
+
+
+def sample_runouts(live, needed, runouts=RUNOUTS, rng=random):
+    '''
+    An (R, needed) array of runouts drawn from the live card indices: every runout
+    if there are at most runouts of them, otherwise runouts whose next cards go
+    through the live cards as evenly as possible.
+    '''
+    if math.comb(len(live), needed) <= runouts:
+        choices = list(itertools.combinations(live, needed))
+    else:
+        firsts = []
+        while len(firsts) < runouts:
+            firsts += rng.sample(live, min(runouts - len(firsts), len(live)))
+        choices = [[first] + rng.sample([card for card in live if card != first], needed - 1) for first in firsts]
+    return np.array(choices, dtype=np.int64).reshape(len(choices), needed)
+
+
+def showdown_values(my_hand, board, runouts=RUNOUTS, rng=random):
+    '''
+    Scores our hand and every live opponent combo over one shared sample of runouts.
+
+    Returns (alive, hero, opp, valid): the mask of the M combos that share no card
+    with our hand or the board, our (R,) final hand values, the (R, M) values of
+    those combos, and an (R, M) mask of the combos each runout leaves possible.
+    '''
+    known = [CARD_INDEX[card] for card in list(my_hand) + list(board)]
+    runout = sample_runouts([i for i in range(len(DECK)) if i not in known], 5 - len(board), runouts, rng)
+    known = np.array(known, dtype=np.int64)
+    alive = ~HOLDS[:, known].any(axis=1)
+    combos = COMBO_CARDS[alive]
+
+    hero = evaluate_batch(np.concatenate([np.broadcast_to(known, (len(runout), len(known))), runout], axis=1))
+    rows = np.empty((len(runout), len(combos), 7), dtype=np.int64)
+    rows[:, :, :len(board)] = known[len(my_hand):]
+    rows[:, :, len(board):5] = runout[:, None, :]
+    rows[:, :, 5:] = combos[None, :, :]
+    opp = evaluate_batch(rows.reshape(-1, 7)).reshape(len(runout), len(combos))
+
+    # a combo can only meet the runouts it shares no card with
+    valid = ~(combos[None, :, :, None] == runout[:, None, None, :]).any(axis=(2, 3))
+    return alive, hero, opp, valid
+
+
+def sampled_combo_equities(my_hand, board, runouts=RUNOUTS, rng=random):
+    '''
+    Our equity against each of the 1326 combos, over one shared sample of runouts
+    with distinct next cards (every runout if there are at most that many).
+    Combos that share a card with our hand or the board are NaN.
+    '''
+    alive, hero, opp, valid = showdown_values(my_hand, board, runouts, rng)
+    points = ((np.sign(hero[:, None] - opp) + 1) * valid).sum(axis=0)
+    counts = valid.sum(axis=0)
+    live_equities = np.divide(points, 2 * counts, out=np.full(len(opp[0]), np.nan), where=counts > 0)
+    live_equities[counts == 0] = np.nanmean(live_equities)
+    equities = np.full(len(COMBOS), np.nan)
+    equities[alive] = live_equities
+    return equities
+
+
+def _rank_classes(cards):
+    '''
+    Groups the rows of an (N, k) card array by their ranks. Returns (classes, counts):
+    the class of each row and the (K, 13) rank counts of each class.
+    '''
+    ranks = np.sort(cards >> 2, axis=1)
+    keys = (ranks * 13 ** np.arange(ranks.shape[1])).sum(axis=1)
+    _, first, classes = np.unique(keys, return_index=True, return_inverse=True)
+    counts = np.zeros((len(first), 13), dtype=np.int64)
+    np.add.at(counts, (np.arange(len(first))[:, None], ranks[first]), 1)
+    return classes.reshape(-1), counts
+
+
+def _suit_masks(cards, suit):
+    '''
+    The 13-bit rank mask of the cards of one suit in each row of an (N, k) card array.
+    '''
+    return (np.left_shift(1, cards >> 2) * ((cards & 3) == suit)).sum(axis=1)
+
+
+def combo_equities(my_hand, board):
+    '''
+    Our exact equity against each of the 1326 combos, over every runout from the
+    flop on. Combos that share a card with our hand or the board are NaN.
+
+    Without a flush a hand's value depends only on its ranks, so each rank
+    pattern of the runout is scored once against each pair of hole ranks (at
+    most 91 x 91 hands), and only the combos that complete a flush are looked
+    at per runout.
+    '''
+    if len(board) < 3:
+        raise ValueError('exact combo equities need a flop')
+    known = [CARD_INDEX[card] for card in list(my_hand) + list(board)]
+    live = [i for i in range(len(DECK)) if i not in known]
+    needed = 5 - len(board)
+    choices = list(itertools.combinations(live, needed))
+    runout = np.array(choices, dtype=np.int64).reshape(len(choices), needed)
+    known = np.array(known, dtype=np.int64)
+    alive = ~HOLDS[:, known].any(axis=1)
+    combos = COMBO_CARDS[alive]
+    final = np.concatenate([np.broadcast_to(known[len(my_hand):], (len(runout), len(board))), runout], axis=1)
+    hero = evaluate_batch(np.concatenate([np.broadcast_to(known[:len(my_hand)], (len(runout), 2)), final], axis=1))
+
+    # our result against every pair of hole ranks on every runout, flushes aside
+    runout_class, runout_counts = _rank_classes(runout)
+    combo_class, combo_counts = _rank_classes(combos)
+    board_counts = np.bincount(known[len(my_hand):] >> 2, minlength=13)
+    counts = board_counts + runout_counts[:, None, :] + combo_counts[None, :, :]
+    rank_values = evaluate_rank_counts(counts.reshape(-1, 13)).reshape(len(runout_counts), len(combo_counts))
+    results = np.sign(hero[:, None] - rank_values[runout_class])
+
+    # sum over the runouts each combo can meet: all of them, less those holding either of its cards
+    touches = np.zeros((len(runout), len(DECK)))
+    touches[np.arange(len(runout))[:, None], runout] = 1.
+    by_card = touches.T @ results
+    first, second = combos[:, 0], combos[:, 1]
+    points = results.sum(axis=0)[combo_class] - by_card[first, combo_class] - by_card[second, combo_class]
+    if needed == 2:
+        # the runout of exactly the combo's two cards was taken off twice
+        pair_runout = np.zeros((len(DECK), len(DECK)), dtype=np.int64)
+        pair_runout[runout[:, 0], runout[:, 1]] = pair_runout[runout[:, 1], runout[:, 0]] = np.arange(len(runout))
+        points += results[pair_runout[first, second], combo_class]
+
+    # correct the combos that make a flush: at most one suit has three or more cards on a full board
+    touched = touches.astype(bool)
+    for suit in range(4):
+        on_board = ((final & 3) == suit).sum(axis=1)
+        rows = np.flatnonzero(on_board >= 3)
+        if not len(rows):
+            continue
+        suited = ((combos & 3) == suit).sum(axis=1)
+        meets = ~(touched[rows][:, first] | touched[rows][:, second])
+        r, c = np.nonzero(meets & (suited[None, :] >= 5 - on_board[rows][:, None]))
+        masks = _suit_masks(final[rows], suit)[r] | _suit_masks(combos, suit)[c]
+        r = rows[r]
+        rank_value = rank_values[runout_class[r], combo_class[c]]
+        value = np.maximum(rank_value, evaluate_flushes(masks))
+        change = np.sign(hero[r] - value) - np.sign(hero[r] - rank_value)
+        points += np.bincount(c, weights=change, minlength=len(combos))
+
+    equities = np.full(len(COMBOS), np.nan)
+    equities[alive] = (points / math.comb(len(live) - 2, needed) + 1.) / 2.
+    return equities
+
+
+def preflop_strength():
+    '''
+    Each combo's preflop equity against a random hand, from the preflop table.
+    '''
+    global _preflop_strength
+    if _preflop_strength is None:
+        by_class = np.zeros(CLASSES.max() + 1)
+        for n, combo in enumerate(COMBOS):
+            if by_class[CLASSES[n]] == 0.:
+                by_class[CLASSES[n]] = preflop_equity(list(combo))
+        _preflop_strength = by_class[CLASSES]
+    return _preflop_strength
+
+
+def made_strength(board):
+    '''
+    Each combo's made-hand strength on the board, as the fraction of live combos it
+    beats (ties count half). Preflop this is the preflop equity instead.
+    Combos that share a card with the board are NaN.
+    '''
+    if not board:
+        return preflop_strength()
+    board_index = np.array([CARD_INDEX[card] for card in board], dtype=np.int64)
+    alive = ~HOLDS[:, board_index].any(axis=1)
+    rows = np.concatenate([np.broadcast_to(board_index, (alive.sum(), len(board))), COMBO_CARDS[alive]], axis=1)
+    values = evaluate_batch(rows)
+    ordered = np.sort(values)
+    below = np.searchsorted(ordered, values, side='left')
+    equal = np.searchsorted(ordered, values, side='right') - below
+    strength = np.full(len(COMBOS), np.nan)
+    strength[alive] = (below + 0.5 * (equal - 1)) / max(len(values) - 1, 1)
+    return strength
+
+
+def _sigmoid(x):
+    return 1. / (1. + np.exp(-x))
+
+
+class StrengthModel():
+    '''
+    A simple action model: the stronger a combo is right now, the likelier the
+    opponent is to raise with it and the less likely to just check.
+
+    Called as model(action, board) with an action class (ActionRaise,
+    ActionCall, ActionCheck) and returns the likelihood of that action for
+    each of the 1326 combos. Every likelihood is at least floor, so one odd
+    action never rules a hand out. Write your own with the same signature to
+    model a particular opponent.
+    '''
+
+    def __init__(self, raise_center=0.7, call_center=0.4, sharpness=8., floor=0.05):
+        self.raise_center = raise_center
+        self.call_center = call_center
+        self.sharpness = sharpness
+        self.floor = floor
+
+    def __call__(self, action, board, **context):
+        strength = np.nan_to_num(made_strength(board), nan=0.5)
+        if action is ActionRaise:
+            likelihood = _sigmoid(self.sharpness * (strength - self.raise_center))
+        elif action is ActionCall:
+            likelihood = _sigmoid(self.sharpness * (strength - self.call_center))
+        elif action is ActionCheck:
+            likelihood = 1. - _sigmoid(self.sharpness * (strength - self.raise_center))
+        else:
+            return np.ones(len(COMBOS))
+        return self.floor + (1. - self.floor) * likelihood
+
+
+class Range():
+    '''
+    The opponent's range for one hand: a weight for each of the 1326 combos.
+
+    Start a fresh one in on_hand_start. remove() and require() apply card
+    removal (our hand, the board, the card revealed in the auction; observe()
+    does all three from a PokerState), and update() reweights the combos after
+    each opponent action by the likelihoods an action model gives.
+    '''
+
+    def __init__(self, weights=None):
+        self.weights = np.ones(len(COMBOS)) if weights is None else np.array(weights, dtype=np.float64)
+
+    def copy(self):
+        return Range(self.weights)
+
+    def remove(self, cards):
+        '''
+        Drops every combo holding any of the given cards.
+        '''
+        self.weights[blocked(cards)] = 0.
+        return self
+
+    def require(self, cards):
+        '''
+        Keeps only the combos holding all of the given cards, e.g. the revealed card.
+        '''
+        for card in cards:
+            self.weights[~HOLDS[:, CARD_INDEX[card]]] = 0.
+        return self
+
+    def observe(self, current_state):
+        '''
+        Applies the card removal known from a PokerState.
+        '''
+        self.remove(list(current_state.my_hand) + list(current_state.board))
+        return self.require(current_state.opp_revealed_cards)
+
+    def update(self, model, action, board, **context):
+        '''
+        Multiplies the weights by model(action, board, **context).
+        '''
+        self.weights *= model(action, board, **context)
+        return self
+
+    def total(self):
+        return float(self.weights.sum())
+
+    def probabilities(self):
+        '''
+        The weights normalized to sum to 1.
+        '''
+        total = self.weights.sum()
+        return self.weights / total if total > 0 else self.weights
+
+    def equity(self, my_hand, board, runouts=RUNOUTS, rng=random):
+        '''
+        Our equity against the range, in one vectorized pass over all its combos.
+        From the flop on it is exact, and on the river it comes from the board's
+        cached ranking. Preflop each combo gets our class's equity against its
+        class from the preflop matchup table, so the range's weights count the
+        combos of each class; runouts and rng only set the sample used when the
+        table has not been built.
+        '''
+        if len(board) == 5:
+            # imported here since pkbot.river builds on this module
+            from .river import river_ranking
+            return float(river_ranking(tuple(board)).against(self.weights).equity(my_hand))
+        row = None if board else matchup_row(my_hand)
+        if board:
+            equities = combo_equities(my_hand, board)
+        elif row is not None:
+            equities = np.asarray(row, dtype=np.float64)[CLASSES]
+            equities[blocked(my_hand)] = np.nan
+        else:
+            equities = sampled_combo_equities(my_hand, board, runouts, rng)
+        weights = np.where(np.isnan(equities), 0., self.weights)
+        total = weights.sum()
+        if total <= 0:
+            return 0.5
+        return float((weights * np.nan_to_num(equities)).sum() / total)
@@ -0,0 +1,101 @@
+'''
+Exact river equity against a weighted range from one sorted ranking per board.
+
+On the river every opponent combo has a fixed strength, so the combos are
+scored and sorted once per board. Against a range, the weight we beat is then
+a prefix sum up to our own strength, found by binary search; combos that hold
+one of our cards are subtracted back out. Each query takes microseconds.
+'''
+import functools
+import numpy as np
+from .batch import CARD_INDEX, evaluate_batch
+from .ranges import COMBOS, COMBO_CARDS, COMBO_INDEX, HOLDS
+
+
+class RiverRanking():
+    '''
+    All 1326 combos scored and sorted by strength on one five-card board.
+    '''
+
+    def __init__(self, board):
+        self.board = tuple(board)
+        board_index = np.array([CARD_INDEX[card] for card in board], dtype=np.int64)
+        alive = ~HOLDS[:, board_index].any(axis=1)
+        rows = np.concatenate([np.broadcast_to(board_index, (alive.sum(), len(board))), COMBO_CARDS[alive]], axis=1)
+        # combos sharing a card with the board keep the value -1
+        self.values = np.full(len(COMBOS), -1, dtype=np.int64)
+        self.values[alive] = evaluate_batch(rows)
+        live = np.flatnonzero(alive)
+        self.order = live[np.argsort(self.values[live], kind='stable')]
+        self.sorted_values = self.values[self.order]
+        # the live combos holding each card, for blocker correction
+        self.card_combos = [np.flatnonzero(HOLDS[:, card] & alive) for card in range(HOLDS.shape[1])]
+
+    def value(self, my_hand):
+        '''
+        Our hand's strength on this board, comparable with eval7.evaluate.
+        '''
+        return int(self.values[COMBO_INDEX[tuple(my_hand)]])
+
+    def against(self, weights=None):
+        '''
+        Prepares queries against a range given as 1326 weights (uniform if None).
+        '''
+        return RiverRange(self, weights)
+
+
+class RiverRange():
+    '''
+    A RiverRanking combined with one set of range weights.
+    '''
+
+    def __init__(self, ranking, weights=None):
+        self.ranking = ranking
+        self.weights = np.ones(len(COMBOS)) if weights is None else np.asarray(weights, dtype=np.float64)
+        self.prefix = np.concatenate([[0.], np.cumsum(self.weights[ranking.order])])
+
+    def win_tie(self, my_hand):
+        '''
+        The fractions of the range's weight that we beat and that we tie,
+        leaving out combos that hold one of our cards.
+        '''
+        ranking = self.ranking
+        value = ranking.value(my_hand)
+        low = np.searchsorted(ranking.sorted_values, value, side='left')
+        high = np.searchsorted(ranking.sorted_values, value, side='right')
+        below = self.prefix[low]
+        equal = self.prefix[high] - below
+        total = self.prefix[-1]
+
+        first, second = (ranking.card_combos[CARD_INDEX[card]] for card in my_hand)
+        # our own combo holds both cards; count it once
+        blockers = np.concatenate([first, second[second != COMBO_INDEX[tuple(my_hand)]]])
+        blocked_weights = self.weights[blockers]
+        blocked_values = ranking.values[blockers]
+        below -= blocked_weights[blocked_values < value].sum()
+        equal -= blocked_weights[blocked_values == value].sum()
+        total -= blocked_weights.sum()
+        if total <= 0:
+            return 0., 0.
+        return below / total, equal / total
+
+    def equity(self, my_hand):
+        '''
+        Our exact showdown equity against the range.
+        '''
+        win, tie = self.win_tie(my_hand)
+        return win + 0.5 * tie
+
+    def beats(self, my_hand):
+        '''
+        The fraction of the range we beat outright.
+        '''
+        return self.win_tie(my_hand)[0]
+
+
+@functools.lru_cache(maxsize=8)
+def river_ranking(board):
+    '''
+    The RiverRanking of a board given as a tuple, built once and cached.
+    '''
+    return RiverRanking(board)
@@ -2,11 +2,16 @@
 The infrastructure for interacting with the engine.
 '''
 import argparse
+import functools
 import socket
 from .actions import ActionBid, ActionFold, ActionCall, ActionCheck, ActionRaise
 from .states import GameInfo, HandResult, GameState, PokerState
 from .states import STARTING_STACK, BIG_BLIND, SMALL_BLIND
 from .base import BaseBot
+from .watchdog import Watchdog
+from .profiler import DecisionProfiler
+from .startup import STARTUP
+from .lockin import LockIn
 
 
 class Runner():
@@ -14,9 +19,14 @@ class Runner():
     Interacts with the engine.
     '''
 
-    def __init__(self, pokerbot, socketfile):
+    def __init__(self, pokerbot, socketfile, decision_deadline=None, profile=None, profile_threshold=0.1,
+                 startup_report=False, lock_in=False):
         self.pokerbot = pokerbot
         self.socketfile = socketfile
+        self.startup_report = startup_report
+        self.lock_in = LockIn() if lock_in else None
+        self.watchdog = Watchdog(decision_deadline) if decision_deadline else None
+        self.profiler = DecisionProfiler(profile, profile_threshold) if profile else None
 
     def receive(self):
         '''
@@ -46,15 +56,45 @@ class Runner():
         self.socketfile.flush()
 
     def run(self):
+        '''
+        Plays the match, writing the profile summary at the end if profiling.
+        '''
+        try:
+            self.play()
+        finally:
+            if self.profiler is not None:
+                self.profiler.write_summary()
+
+    def play(self):
         '''
         Reconstructs the game tree based on the action history received from the engine.
         '''
+        on_hand_start = self.pokerbot.on_hand_start
+        on_hand_end = self.pokerbot.on_hand_end
+        get_move = self.pokerbot.get_move
+        if self.profiler is not None:
+            on_hand_start = self.profiler.wrap('on_hand_start', on_hand_start)
+            on_hand_end = self.profiler.wrap('on_hand_end', on_hand_end)
+            get_move = self.profiler.wrap('get_move', get_move)
+        if self.watchdog is not None:
+            # a decision that overran may still be running; hand callbacks wait for it or are deferred
+            on_hand_start = self.watchdog.exclusive(on_hand_start)
+            on_hand_end = self.watchdog.exclusive(on_hand_end)
+            get_move = functools.partial(self.watchdog.call, get_move, self.pokerbot.fallback_move)
+        if self.lock_in is not None:
+            get_move = self.lock_in.wrap(get_move)
         game_info = GameInfo(0, 0., 1)
         state: GameState = None
         active = 0
         round_flag = True
+        ponderer = self.pokerbot.ponderer
+        observer = self.pokerbot.observer
+        first_decision = self.startup_report
         for packet in self.receive():
+            if ponderer is not None:
+                ponderer.pause()
             for clause in packet:
+                previous = state
                 if clause[0] == 'T':
                     game_info = GameInfo(game_info.bankroll, float(clause[1:]), game_info.round_num)
                 elif clause[0] == 'P':
@@ -66,7 +106,7 @@ class Runner():
                     chips = [STARTING_STACK - SMALL_BLIND, STARTING_STACK - BIG_BLIND]
                     state = GameState(0, 0, False, [None, None], wagers, chips, hands, [[], []], [], None)
                     if round_flag:
-                        self.pokerbot.on_hand_start(game_info, PokerState(state, active))
+                        on_hand_start(game_info, PokerState(state, active))
                         round_flag = False
                 elif clause[0] == 'F':
                     state = state.apply_action(ActionFold())
@@ -106,17 +146,31 @@ class Runner():
                     payoffs[active] = delta
                     state = HandResult(payoffs, state.bids, state.parent_state)
                     game_info = GameInfo(game_info.bankroll + delta, game_info.time_bank, game_info.round_num)
-                    self.pokerbot.on_hand_end(game_info, PokerState(state, active))
+                    on_hand_end(game_info, PokerState(state, active))
                     game_info = GameInfo(game_info.bankroll, game_info.time_bank, game_info.round_num + 1)
                     round_flag = True
                 elif clause[0] == 'Q':
+                    if ponderer is not None:
+                        ponderer.stop()
+                    if observer is not None:
+                        observer.close()
                     return
+                if observer is not None:
+                    observer.observe(clause, previous, state, active)
             if round_flag:  # ack the engine
                 self.send(ActionCheck())
             else:
                 assert active == state.dealer % 2
-                action = self.pokerbot.get_move(game_info, PokerState(state, active))
+                action = get_move(game_info, PokerState(state, active))
                 self.send(action)
+                if first_decision:
+                    STARTUP.mark('first decision sent')
+                    print(STARTUP.report())
+                    first_decision = False
+            if ponderer is not None and not (self.watchdog is not None and self.watchdog.busy()):
+                # think on the opponent's time, unless a stalled decision still holds the bot
+                self.pokerbot.ponder(game_info, PokerState(state, active))
+                ponderer.resume()
 
 def parse_args():
     '''
@@ -124,21 +178,54 @@ def parse_args():
     '''
     parser = argparse.ArgumentParser(prog='python3 player.py')
     parser.add_argument('--host', type=str, default='localhost', help='Host to connect to, defaults to localhost')
+    parser.add_argument('--decision-deadline', type=float, default=None,
+                        help='Seconds allowed per get_move before falling back to a safe action')
+    parser.add_argument('--profile', type=str, default=None,
+                        help='Time every callback and write a summary to this file at match end')
+    parser.add_argument('--profile-threshold', type=float, default=0.1,
+                        help='Save a cProfile snapshot of any callback slower than this many seconds')
+    parser.add_argument('--startup-report', action='store_true',
+                        help='Print how long the bot took from import to its first decision')
+    parser.add_argument('--lock-in', action='store_true',
+                        help='Stop calling get_move once the match is won or the time bank is nearly gone')
     parser.add_argument('port', type=int, help='Port on host to connect to')
     return parser.parse_args()
 
-def run_bot(pokerbot, args):
+def run_bot(pokerbot, args, decision_deadline=None, profile=None, profile_threshold=None, startup_report=None,
+            lock_in=None):
     '''
     Runs the pokerbot.
+    If decision_deadline (seconds) is given, or passed as --decision-deadline,
+    get_move calls that overrun it are answered by pokerbot.fallback_move.
+    If profile (a file path) is given, or passed as --profile, every callback
+    is timed and a summary is written there when the match ends.
+    If startup_report is set, or --startup-report is passed, the time from
+    importing pkbot to the first decision is printed to the player log.
+    If lock_in is set, or --lock-in is passed, get_move is no longer called
+    once folding out the match still wins it or the time bank runs low.
     '''
+    STARTUP.mark('run_bot called')
+    if decision_deadline is None:
+        decision_deadline = getattr(args, 'decision_deadline', None)
+    if profile is None:
+        profile = getattr(args, 'profile', None)
+    if profile_threshold is None:
+        profile_threshold = getattr(args, 'profile_threshold', 0.1)
+    if startup_report is None:
+        startup_report = getattr(args, 'startup_report', False)
+    if lock_in is None:
+        lock_in = getattr(args, 'lock_in', False)
     assert isinstance(pokerbot, BaseBot)
     try:
         sock = socket.create_connection((args.host, args.port))
     except OSError:
         print('Could not connect to {}:{}'.format(args.host, args.port))
         return
+    STARTUP.mark('connected')
     socketfile = sock.makefile('rw')
-    runner = Runner(pokerbot, socketfile)
+    runner = Runner(pokerbot, socketfile, decision_deadline=decision_deadline,
+                    profile=profile, profile_threshold=profile_threshold,
+                    startup_report=startup_report, lock_in=lock_in)
     runner.run()
     socketfile.close()
     sock.close()
\ No newline at end of file
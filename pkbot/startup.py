@@ -0,0 +1,139 @@
+'''
+Fast bot startup: lazy imports, memory-mapped tables and a startup-time report.
+'''
+import importlib.util
+import mmap
+import sys
+import time
+
+_IMPORTED_AT = time.perf_counter()
+_CPU_BEFORE_IMPORT = time.process_time()
+
+
+def lazy_import(name):
+    '''
+    Returns module name, deferring the actual import until an attribute is first used.
+    Use it for heavy dependencies such as eval7 so they do not slow down launch.
+    A missing module only raises ImportError when it is first used, so code
+    that never touches it still imports.
+    '''
+    if name in sys.modules and sys.modules[name] is not None:
+        return sys.modules[name]
+    try:
+        spec = importlib.util.find_spec(name)
+    except ValueError:
+        spec = None
+    if spec is None or name in sys.modules:
+        return MissingModule(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+class MissingModule():
+    '''
+    Stands in for a module that is not installed; using it raises the ImportError.
+    '''
+
+    def __init__(self, name):
+        self.__name__ = name
+
+    def __getattr__(self, attribute):
+        raise ImportError('No module named {!r}'.format(self.__name__))
+
+
+class MappedTable():
+    '''
+    A read-only array of fixed-size numbers stored in a binary file.
+
+    The file is memory-mapped on first access, so opening a table costs nothing
+    at startup and only the pages actually touched are read from disk. The file
+    holds raw values in native byte order, optionally after a header of offset
+    bytes; typecode is a struct/array code such as 'f', 'H' or 'i'.
+    '''
+
+    def __init__(self, path, typecode='f', offset=0):
+        self.path = path
+        self.typecode = typecode
+        self.offset = offset
+        self._file = None
+        self._mmap = None
+        self._view = None
+
+    @property
+    def view(self):
+        '''
+        The table contents as a memoryview, mapping the file if needed.
+        '''
+        if self._view is None:
+            self._file = open(self.path, 'rb')
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._mmap)[self.offset:].cast(self.typecode)
+        return self._view
+
+    @property
+    def loaded(self):
+        return self._view is not None
+
+    def header(self):
+        '''
+        Returns the raw header bytes in front of the values.
+        '''
+        with open(self.path, 'rb') as table_file:
+            return table_file.read(self.offset)
+
+    def __getitem__(self, index):
+        return self.view[index]
+
+    def __len__(self):
+        return len(self.view)
+
+    def close(self):
+        '''
+        Unmaps the file. The table maps it again if used afterwards.
+        '''
+        if self._view is not None:
+            self._view.release()
+            self._mmap.close()
+            self._file.close()
+            self._view = self._mmap = self._file = None
+
+
+class StartupReport():
+    '''
+    Records how long the bot took to get from launch to its first decision.
+    '''
+
+    def __init__(self):
+        self.marks = [('pkbot imported', _IMPORTED_AT)]
+
+    def mark(self, label):
+        '''
+        Records that label happened now.
+        '''
+        self.marks.append((label, time.perf_counter()))
+
+    def report(self):
+        '''
+        Returns the recorded marks as text, each with the time since the previous one.
+        '''
+        lines = ['startup: {:.3f}s cpu before pkbot was imported'.format(_CPU_BEFORE_IMPORT)]
+        previous = _IMPORTED_AT
+        for label, when in self.marks[1:]:
+            lines.append('  +{:.3f}s {}'.format(when - previous, label))
+            previous = when
+        lines.append('  {:.3f}s total since pkbot was imported'.format(previous - _IMPORTED_AT))
+        return '\n'.join(lines)
+
+
+STARTUP = StartupReport()
+
+
+def mark(label):
+    '''
+    Adds a mark to the startup report, e.g. mark('imports done') at the end of your imports.
+    '''
+    STARTUP.mark(label)
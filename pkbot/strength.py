@@ -0,0 +1,142 @@
+'''
+Hand strength distributions: E[HS], E[HS^2] and positive/negative potential.
+
+Hand strength (HS) is the fraction of opponent combos we beat, ties counting
+half. Its distribution over the runouts still to come separates hands with the
+same equity: a made hand sits at one HS while a draw spreads between
+near 0 and near 1, which E[HS^2] and the potentials pick up. Everything is
+computed for all opponent combos and runouts in one vectorized pass.
+
+Offline, gen_strength_tables.py runs the same computation for every hand on
+every canonical flop and writes pkbot/data/strength.bin, read by flop_strength.
+'''
+import os
+import random
+import struct
+from collections import namedtuple
+import numpy as np
+from .batch import CARD_INDEX, evaluate_batch
+from .canonical import Isomorphism, suit_relabel
+from .ranges import COMBO_CARDS, COMBO_INDEX, HOLDS, RUNOUTS, sample_runouts, showdown_values
+from .startup import MappedTable
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'strength.bin')
+
+# header: magic, format version, runouts sampled per flop
+HEADER = struct.Struct('<4sIQ')
+MAGIC = b'PKHS'
+VERSION = 1
+
+# values stored per (flop, combo), each quantized to 16 bits
+FIELDS = ('hs', 'ehs', 'ehs2', 'ppot', 'npot')
+SCALE = 65535
+
+Strength = namedtuple('Strength', ['hs', 'ehs', 'ehs2', 'ppot', 'npot', 'histogram'])
+
+FLOPS = Isomorphism((3,))
+
+_table = MappedTable(TABLE_PATH, 'H', HEADER.size)
+
+
+def outcome_counts(now, final, valid, axis=None):
+    '''
+    Counts the valid pairs by (comparison now, comparison at the river), each +1
+    ahead, 0 tied or -1 behind, summing over axis. Returns a 3x3 list indexed
+    [now + 1][final + 1].
+    '''
+    return [[((now == a) & (final == b) & valid).sum(axis=axis) for b in (-1, 0, 1)] for a in (-1, 0, 1)]
+
+
+def potentials(counts):
+    '''
+    Billings-style positive and negative potential (PPot, NPot) from outcome_counts.
+    '''
+    (bb, bt, ba), (tb, tt, ta), (ab, at, aa) = counts
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ppot = (ba + bt / 2 + ta / 2) / (bb + bt + ba + (tb + tt + ta) / 2)
+        npot = (ab + at / 2 + tb / 2) / (ab + at + aa + (tb + tt + ta) / 2)
+    return np.nan_to_num(ppot), np.nan_to_num(npot)
+
+
+def strength(my_hand, board, runouts=RUNOUTS, bins=10, rng=random):
+    '''
+    The distribution of our hand strength against a random hand on a board of 3 to 5 cards.
+
+    Returns Strength(hs, ehs, ehs2, ppot, npot, histogram): HS now, its mean and
+    mean square at the river, the chance of moving from behind to ahead (PPot) and
+    from ahead to behind (NPot), and the fraction of runouts in each of bins equal
+    HS buckets. On the river there is nothing to come, so ehs equals hs.
+    '''
+    alive, hero, opp, valid = showdown_values(my_hand, board, runouts, rng)
+    known = np.array([CARD_INDEX[card] for card in list(my_hand) + list(board)], dtype=np.int64)
+    hero_now = evaluate_batch(known[None, :])[0]
+    opp_now = evaluate_batch(np.concatenate([np.broadcast_to(known[len(my_hand):], (alive.sum(), len(board))),
+                                             COMBO_CARDS[alive]], axis=1))
+    now = np.sign(hero_now - opp_now)
+    final = np.sign(hero[:, None] - opp)
+
+    hs = float((now + 1).sum() / (2 * len(now)))
+    counts = valid.sum(axis=1)
+    river_hs = ((final + 1) * valid).sum(axis=1) / np.maximum(2 * counts, 1)
+    ppot, npot = potentials(outcome_counts(now[None, :], final, valid))
+    histogram = np.histogram(river_hs, bins=bins, range=(0., 1.))[0] / len(river_hs)
+    return Strength(hs, float(river_hs.mean()), float((river_hs ** 2).mean()), float(ppot), float(npot), histogram)
+
+
+def flop_table(flop, runouts=RUNOUTS, rng=random):
+    '''
+    (hs, ehs, ehs2, ppot, npot) for every one of the 1326 combos on a flop, as a
+    (1326, 5) array (zeros for combos that share a card with the flop), from one
+    shared sample of turn and river cards. This is what gen_strength_tables.py
+    stores; it compares every pair of combos, so it is meant for offline use.
+    '''
+    flop_index = np.array([CARD_INDEX[card] for card in flop], dtype=np.int64)
+    alive = ~HOLDS[:, flop_index].any(axis=1)
+    combos = COMBO_CARDS[alive]
+    holds = HOLDS[alive]
+    disjoint = ~(holds.astype(np.int32) @ holds.T.astype(np.int32)).astype(bool)
+    values = evaluate_batch(np.concatenate([np.broadcast_to(flop_index, (len(combos), 3)), combos], axis=1))
+    now = np.sign(values[:, None] - values[None, :]).astype(np.int8)
+    hs = ((now + 1) * disjoint).sum(axis=1) / (2 * disjoint.sum(axis=1))
+
+    live = [i for i in range(len(CARD_INDEX)) if i not in flop_index]
+    hs_sum = np.zeros(len(combos))
+    hs_squares = np.zeros(len(combos))
+    seen = np.zeros(len(combos))
+    counts = [[np.zeros(len(combos)) for _ in range(3)] for _ in range(3)]
+    for runout in sample_runouts(live, 2, runouts, rng):
+        live_now = ~holds[:, runout].any(axis=1)
+        board = np.concatenate([flop_index, runout])
+        final_values = evaluate_batch(np.concatenate([np.broadcast_to(board, (live_now.sum(), 5)), combos[live_now]], axis=1))
+        final = np.sign(final_values[:, None] - final_values[None, :]).astype(np.int8)
+        valid = disjoint[np.ix_(live_now, live_now)]
+        river_hs = ((final + 1) * valid).sum(axis=1) / (2 * valid.sum(axis=1))
+        hs_sum[live_now] += river_hs
+        hs_squares[live_now] += river_hs ** 2
+        seen[live_now] += 1
+        runout_counts = outcome_counts(now[np.ix_(live_now, live_now)], final, valid, axis=1)
+        for a in range(3):
+            for b in range(3):
+                counts[a][b][live_now] += runout_counts[a][b]
+    ppot, npot = potentials(counts)
+    seen = np.maximum(seen, 1)
+    result = np.zeros((len(COMBO_CARDS), len(FIELDS)))
+    result[alive] = np.stack([hs, hs_sum / seen, hs_squares / seen, ppot, npot], axis=1)
+    return result
+
+
+def table_available():
+    return os.path.exists(TABLE_PATH)
+
+
+def flop_strength(my_hand, flop):
+    '''
+    (hs, ehs, ehs2, ppot, npot) for our hand on a flop from the precomputed table,
+    or None if the table has not been built.
+    '''
+    if not table_available():
+        return None
+    relabel = suit_relabel([flop])
+    combo = COMBO_INDEX[tuple(card[0] + relabel[card[1]] for card in my_hand)]
+    start = (FLOPS.index([flop]) * len(COMBO_CARDS) + combo) * len(FIELDS)
+    return tuple(_table[start + i] / SCALE for i in range(len(FIELDS)))
@@ -0,0 +1,145 @@
+'''
+Per-decision deadlines with a safe fallback action.
+'''
+import functools
+import threading
+import time
+from .actions import ActionFold, ActionCheck, ActionBid
+
+_local = threading.local()
+
+
+class Deadline():
+    '''
+    A point in time by which a decision should be made.
+    '''
+
+    def __init__(self, budget):
+        self.start = time.perf_counter()
+        self.end = self.start + budget if budget is not None else float('inf')
+        self.cancelled = False
+
+    def remaining(self):
+        '''
+        Returns the number of seconds left, never negative.
+        '''
+        if self.cancelled:
+            return 0.
+        return max(0., self.end - time.perf_counter())
+
+    def expired(self):
+        '''
+        True once the deadline has passed or the decision was abandoned.
+        '''
+        return self.cancelled or time.perf_counter() >= self.end
+
+    def cancel(self):
+        '''
+        Marks the decision as abandoned. Long loops should poll expired() and stop.
+        '''
+        self.cancelled = True
+
+
+def current_deadline():
+    '''
+    Returns the Deadline of the decision running on this thread, or None outside a watchdog.
+    '''
+    return getattr(_local, 'deadline', None)
+
+
+def safe_action(current_state):
+    '''
+    The cheapest legal action that never puts more chips at risk: bid 0, check, or fold.
+    '''
+    if current_state.can_act(ActionBid):
+        return ActionBid(0)
+    if current_state.can_act(ActionCheck):
+        return ActionCheck()
+    return ActionFold()
+
+
+class Watchdog():
+    '''
+    Runs each decision on a worker thread and answers with a fallback if it overruns.
+
+    Python threads cannot be killed, so an overrunning worker is only cancelled
+    through its Deadline; its eventual result is discarded. While it is still
+    running, later decisions wait for it within their own budget and fall back
+    if it does not finish, so the bot is never entered by two decisions at once.
+    Other callbacks that change the bot's state, like on_hand_start and
+    on_hand_end, should be wrapped with exclusive(): they wait for it within
+    one budget too, and are otherwise deferred until it lets go.
+    '''
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.decisions = 0
+        self.overruns = 0
+        self._stalled = None
+        # held by the worker for as long as a decision runs
+        self._lock = threading.Lock()
+        # (func, args) of callbacks that could not wait for a stalled decision, oldest first
+        self._deferred = []
+
+    def busy(self):
+        '''
+        True while an overrun decision is still running on its worker.
+        '''
+        return self._stalled is not None and self._stalled.is_alive()
+
+    def exclusive(self, func):
+        '''
+        Wraps a callback so it never runs alongside a decision. If a stalled
+        worker does not finish within the budget, the callback is deferred and
+        returns None: it runs, in order with any other deferred callbacks, just
+        before whatever next gets hold of the bot, so a get_move that ignores
+        its Deadline never holds up the engine for longer than the budget.
+        '''
+        @functools.wraps(func)
+        def wrapper(*args):
+            if not self._lock.acquire(timeout=self.budget):
+                self._deferred.append((func, args))
+                return None
+            try:
+                self._run_deferred()
+                return func(*args)
+            finally:
+                self._lock.release()
+        return wrapper
+
+    def _run_deferred(self):
+        while self._deferred:
+            func, args = self._deferred.pop(0)
+            func(*args)
+
+    def call(self, func, fallback, *args):
+        '''
+        Returns func(*args) if it finishes within the budget, otherwise fallback(*args).
+        '''
+        self.decisions += 1
+        deadline = Deadline(self.budget)
+        if self._stalled is not None:
+            self._stalled.join(deadline.remaining())
+            if self._stalled.is_alive():
+                self.overruns += 1
+                return fallback(*args)
+            self._stalled = None
+        result = []
+
+        def work():
+            with self._lock:
+                _local.deadline = deadline
+                self._run_deferred()
+                result.append(func(*args))
+
+        worker = threading.Thread(target=work, daemon=True)
+        worker.start()
+        worker.join(deadline.remaining())
+        if not result:
+            # overran, or raised (the traceback goes to the player log)
+            deadline.cancel()
+            if worker.is_alive():
+                self._stalled = worker
+            self.overruns += 1
+            return fallback(*args)
+        return result[0]
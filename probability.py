@@ -1,5 +1,6 @@
 import random
-import itertools
+
+from pkbot.evaluator import evaluate
 
 RANKS = "23456789TJQKA"
 SUITS = "dsch"
@@ -10,41 +11,12 @@ SUITS = "dsch"
 # =====================================================
 
 def hand_rank(cards):
-    ranks = sorted([RANKS.index(c[0]) for c in cards], reverse=True)
-    suits = [c[1] for c in cards]
-
-    counts = {r: ranks.count(r) for r in set(ranks)}
-    count_values = sorted(counts.values(), reverse=True)
-
-    is_flush = len(set(suits)) == 1
-    is_straight = len(set(ranks)) == 5 and max(ranks) - min(ranks) == 4
-
-    if is_straight and is_flush:
-        return (8, max(ranks))
-    if 4 in count_values:
-        return (7,)
-    if 3 in count_values and 2 in count_values:
-        return (6,)
-    if is_flush:
-        return (5, ranks)
-    if is_straight:
-        return (4, max(ranks))
-    if 3 in count_values:
-        return (3,)
-    if count_values.count(2) == 2:
-        return (2,)
-    if 2 in count_values:
-        return (1,)
-    return (0, ranks)
+    # pkbot.evaluator orders hands exactly like eval7 (kickers, wheel included)
+    return evaluate(cards)
 
 
 def best_hand(seven_cards):
-    best = None
-    for combo in itertools.combinations(seven_cards, 5):
-        rank = hand_rank(combo)
-        if best is None or rank > best:
-            best = rank
-    return best
+    return evaluate(seven_cards)
 
 
 # =====================================================
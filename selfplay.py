@@ -0,0 +1,299 @@
+'''
+Generates self-play datasets by running bots against each other in-process.
+
+Each worker process imports the bot files, wraps every Player in the usual
+pkbot Runner on a thread and talks to it through in-memory queues, so hands
+are played by the engine's own GameState and messages without sockets or
+subprocesses. Shards are independent: shard i plays --matches matches of
+--hands hands with decks, auction reveals and bot randomness all seeded from
+(--seed, i), so any shard can be regenerated. Pondering bots have their
+Ponderer stopped, since what a background thread finishes in time depends on
+the machine. Reproducing also needs no time bank, the default: with --clock, a
+bot that runs out of time on a busy machine plays differently from one that
+does not.
+
+Every decision becomes one row of <out>/shard-<i>.npz:
+
+  match, round, seat (0 = small blind), bot (index into bots)
+  street (0 pre-flop, 1 flop, 2 turn, 3 river), auction
+  pot, cost, my_chips, opp_chips     chips as the acting bot saw them
+  hole (2), board (5), revealed      card indices (rank * 4 + suit), -1 if unknown
+  action (engine letter as a byte), amount
+  substituted                        the engine replaced the bot's answer (out of time,
+                                     illegal or misformatted action, crashed bot)
+  payoff                             what the acting bot won in the hand
+
+Usage: python selfplay.py BOT_FILE BOT_FILE [--shards N] [--matches N] [--hands N]
+                          [--workers N] [--seed S] [--out DIR] [--clock SECONDS]
+'''
+import argparse
+import contextlib
+import importlib.util
+import multiprocessing
+import os
+import queue
+import random
+import socket
+import threading
+import time
+
+import eval7
+import numpy as np
+
+import engine
+from engine import (ActionBid, ActionCall, ActionCheck, ActionFold, ActionRaise, GameState, HandResult,
+                    GAME_CLOCK, NUM_ROUNDS, STARTING_STACK)
+from pkbot.equity import DECK
+from pkbot.runner import Runner
+
+CARD_INDEX = {card: i for i, card in enumerate(DECK)}
+STREET_INDEX = {0: 0, 3: 1, 4: 2, 5: 3}
+CODES = {ActionFold: 'F', ActionCall: 'C', ActionCheck: 'K', ActionRaise: 'R', ActionBid: 'A'}
+COLUMNS = ('match', 'round', 'seat', 'bot', 'street', 'auction', 'pot', 'cost', 'my_chips', 'opp_chips',
+           'action', 'amount', 'substituted', 'payoff')
+
+
+class SeededDeck():
+    '''
+    A stand-in for eval7.Deck that deals from its own random.Random, so deals
+    depend only on the seed and not on how much randomness the bots use.
+    '''
+
+    def __init__(self, rng):
+        self.cards = [eval7.Card(card) for card in DECK]
+        rng.shuffle(self.cards)
+
+    def deal(self, n):
+        dealt, self.cards = self.cards[:n], self.cards[n:]
+        return dealt
+
+    def peek(self, n):
+        return self.cards[:n]
+
+
+class QueueFile():
+    '''
+    One end of an in-memory line connection, with the readline/write/flush the Runner and engine use.
+    timeout, if given, is called before each read for the seconds to wait, None for no limit.
+    '''
+
+    def __init__(self, inbox, outbox, timeout=None):
+        self.inbox = inbox
+        self.outbox = outbox
+        self.timeout = timeout or (lambda: None)
+        self.buffer = []
+
+    def readline(self):
+        try:
+            line = self.inbox.get(timeout=self.timeout())
+        except queue.Empty:
+            raise socket.timeout
+        if line is None:
+            raise OSError('bot stopped')
+        return line
+
+    def write(self, text):
+        self.buffer.append(text)
+
+    def flush(self):
+        self.outbox.put(''.join(self.buffer))
+        self.buffer = []
+
+
+class InProcessBot(engine.BotProcess):
+    '''
+    engine.BotProcess with the bot running on a thread of this process.
+    Queries record a row per decision in rows, which both bots of a match share.
+    clock is the time bank in seconds, None for no limit.
+    '''
+
+    def __init__(self, name, player_class, index, clock, rows):
+        super().__init__(name, None)
+        self.player_class = player_class
+        self.index = index
+        self.time_bank = float('inf') if clock is None else clock
+        self.rows = rows
+        self.thread = None
+
+    def run(self):
+        to_bot, to_engine = queue.Queue(), queue.Queue()
+        self.socketfile = QueueFile(to_engine, to_bot, timeout=self.timeout)
+        player = self.player_class()
+        if player.ponderer is not None:
+            # background work would race the bot for the shared random state, so
+            # pondered results are computed when asked for, in a fixed order
+            player.ponderer.stop()
+        runner = Runner(player, QueueFile(to_bot, to_engine))
+
+        def play():
+            try:
+                runner.run()
+            finally:
+                # a crashed bot looks disconnected to the engine
+                to_engine.put(None)
+
+        self.thread = threading.Thread(target=play, daemon=True)
+        self.thread.start()
+
+    def timeout(self):
+        return max(self.time_bank, 1e-3) if self.time_bank < float('inf') else None
+
+    def stop(self):
+        self.socketfile.write('Q\n')
+        self.socketfile.flush()
+        self.thread.join(timeout=1.)
+
+    def query(self, state, player_message, game_log, round_num):
+        # the engine logs every answer it rejects, and stops asking once the time bank is spent
+        asked = self.time_bank > 0.
+        logged = len(game_log)
+        action = super().query(state, player_message, game_log, round_num)
+        if isinstance(state, GameState):
+            active = state.dealer % 2
+            board = state.deck.peek(state.street) if state.street else []
+            self.rows.append({
+                'round': round_num, 'seat': active, 'bot': self.index,
+                'street': STREET_INDEX[state.street], 'auction': state.auction,
+                'pot': 2 * STARTING_STACK - sum(state.chips), 'cost': state.wagers[1 - active] - state.wagers[active],
+                'my_chips': state.chips[active], 'opp_chips': state.chips[1 - active],
+                'hole': [CARD_INDEX[str(card)] for card in state.hands[active]],
+                'board': [CARD_INDEX[str(card)] for card in board] + [-1] * (5 - len(board)),
+                'revealed': CARD_INDEX[str(state.opp_hands[active][0])] if state.opp_hands[active] else -1,
+                'action': ord(CODES[type(action)]),
+                'amount': getattr(action, 'amount', 0),
+                'substituted': not asked or len(game_log) > logged,
+            })
+        return action
+
+
+class SelfPlayMatch(engine.PokerMatch):
+    '''
+    engine.PokerMatch playing hands from a SeededDeck.
+    '''
+
+    def __init__(self, rng):
+        super().__init__(small_log=True)
+        self.rng = rng
+
+    def play_hand(self, players, round_num):
+        deck = SeededDeck(self.rng)
+        hands = [deck.deal(2), deck.deal(2)]
+        wagers = [engine.SMALL_BLIND, engine.BIG_BLIND]
+        chips = [STARTING_STACK - engine.SMALL_BLIND, STARTING_STACK - engine.BIG_BLIND]
+        state = GameState(0, 0, False, [None, None], wagers, chips, hands, [[], []], deck, None)
+        first_row = len(players[0].rows)
+        while not isinstance(state, HandResult):
+            self.log_state(players, state)
+            active = state.dealer % 2
+            player = players[active]
+            action = player.query(state, self.player_messages[active], self.log, round_num)
+            self.log_action(player.name, action, state.wagers == [0, 0])
+            state = state.apply_action(action)
+        self.log_result(players, state)
+        for player, player_message, delta in zip(players, self.player_messages, state.payoffs):
+            player.query(state, player_message, self.log, round_num)
+            player.bankroll += delta
+        for row in players[0].rows[first_row:]:
+            row['payoff'] = state.payoffs[row['seat']]
+        return state.payoffs
+
+
+def load_bot(path, index):
+    '''
+    Imports a bot file as a module.
+    '''
+    spec = importlib.util.spec_from_file_location(f'selfplay_bot{index}', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_player(path, index):
+    '''
+    The Player class defined in a bot file.
+    '''
+    return load_bot(path, index).Player
+
+
+def play_match(player_classes, names, hands, rng, clock, rows):
+    '''
+    Plays one match with decks dealt from rng, the first player in the small
+    blind on the first hand. Decisions are appended to rows; returns both
+    players' (bankroll, seconds spent deciding).
+    '''
+    players = [InProcessBot(names[i], player_classes[i], i, clock, rows) for i in range(2)]
+    bots = list(players)
+    for player in players:
+        player.run()
+    game = SelfPlayMatch(rng)
+    for round_num in range(1, hands + 1):
+        game.play_hand(players, round_num)
+        players = players[::-1]
+    for player in players:
+        player.stop()
+    return [(bot.bankroll, sum(bot.query_times)) for bot in bots]
+
+
+def play_shard(args):
+    '''
+    Plays one shard and writes it; returns (shard, hands, decisions, seconds).
+    '''
+    shard, bot_files, matches, hands, seed, out, clock = args
+    t0 = time.perf_counter()
+    shard_seed = seed * 1000003 + shard
+    random.seed(shard_seed)
+    np.random.seed(shard_seed % 2 ** 32)
+    rng = random.Random(shard_seed)
+    player_classes = [load_player(path, i) for i, path in enumerate(bot_files)]
+    names = [os.path.splitext(os.path.basename(path))[0] for path in bot_files]
+    rows = []
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for match in range(matches):
+            match_rows = []
+            play_match(player_classes, names, hands, rng, clock, match_rows)
+            for row in match_rows:
+                row['match'] = match
+            rows.extend(match_rows)
+
+    arrays = {column: np.array([row[column] for row in rows], dtype=np.int32) for column in COLUMNS}
+    arrays['auction'] = arrays['auction'].astype(bool)
+    arrays['substituted'] = arrays['substituted'].astype(bool)
+    arrays['action'] = arrays['action'].astype(np.uint8)
+    for column in ('match', 'round', 'seat', 'bot', 'street'):
+        arrays[column] = arrays[column].astype(np.int16)
+    arrays['hole'] = np.array([row['hole'] for row in rows], dtype=np.int8).reshape(-1, 2)
+    arrays['board'] = np.array([row['board'] for row in rows], dtype=np.int8).reshape(-1, 5)
+    arrays['revealed'] = np.array([row['revealed'] for row in rows], dtype=np.int8)
+    arrays['bots'] = np.array(names)
+    arrays['seed'] = np.array(shard_seed)
+    np.savez_compressed(os.path.join(out, f'shard-{shard:05d}.npz'), **arrays)
+    return shard, matches * hands, len(rows), time.perf_counter() - t0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('bots', nargs=2, help='Bot files, e.g. bot4.py example_bot.py')
+    parser.add_argument('--shards', type=int, default=8)
+    parser.add_argument('--matches', type=int, default=1, help='Matches per shard; bots are restarted for each')
+    parser.add_argument('--hands', type=int, default=NUM_ROUNDS, help='Hands per match')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes')
+    parser.add_argument('--seed', type=int, default=2026)
+    parser.add_argument('--out', type=str, default='selfplay')
+    parser.add_argument('--clock', type=float, default=None,
+                        help=f'Time bank per bot per match in seconds, e.g. {GAME_CLOCK}; unlimited by default')
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    bot_files = [os.path.abspath(path) for path in args.bots]
+    jobs = [(shard, bot_files, args.matches, args.hands, args.seed, args.out, args.clock)
+            for shard in range(args.shards)]
+    t0 = time.perf_counter()
+    total_hands = total_decisions = 0
+    with multiprocessing.Pool(args.workers) as pool:
+        for done, (shard, hands, decisions, seconds) in enumerate(pool.imap_unordered(play_shard, jobs), 1):
+            total_hands += hands
+            total_decisions += decisions
+            elapsed = time.perf_counter() - t0
+            print(f"{done}/{args.shards} shard {shard}: {hands} hands in {seconds:.1f}s, "
+                  f"total {total_hands / elapsed:.0f} hands/s, {total_decisions / elapsed:.0f} decisions/s", flush=True)
+    print(f"Wrote {total_hands} hands, {total_decisions} decisions to {args.out} in {time.perf_counter() - t0:.1f}s")
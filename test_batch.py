@@ -0,0 +1,66 @@
+'''
+Checks pkbot.batch.evaluate_batch against eval7 on random hands and times both,
+then checks the exact pkbot.ranges.combo_equities against eval7 enumeration.
+
+Usage: python test_batch.py [hands]
+'''
+import itertools
+import random
+import sys
+import time
+
+import eval7
+import numpy as np
+
+from pkbot.batch import evaluate_batch, tables
+from pkbot.equity import DECK
+from pkbot.preflop import COMBOS
+from pkbot.ranges import COMBO_INDEX, combo_equities
+
+
+def enumerated_equity(my_hand, combo, board):
+    '''
+    Our equity against one combo by evaluating every runout with eval7.
+    '''
+    hero = [eval7.Card(card) for card in list(my_hand) + list(board)]
+    villain = [eval7.Card(card) for card in list(combo) + list(board)]
+    known = set(my_hand) | set(combo) | set(board)
+    live = [eval7.Card(card) for card in DECK if card not in known]
+    points = runouts = 0
+    for runout in itertools.combinations(live, 5 - len(board)):
+        ours, theirs = eval7.evaluate(hero + list(runout)), eval7.evaluate(villain + list(runout))
+        points += (ours > theirs) + 0.5 * (ours == theirs)
+        runouts += 1
+    return points / runouts
+
+if __name__ == '__main__':
+    num_hands = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = np.random.default_rng(2026)
+    cards = [eval7.Card(card) for card in DECK]
+    tables()
+    for size in (7, 6, 5):
+        hands = np.argsort(rng.random((num_hands, len(DECK))), axis=1)[:, :size]
+        t0 = time.perf_counter()
+        values = evaluate_batch(hands)
+        t1 = time.perf_counter()
+        expected = np.array([eval7.evaluate([cards[i] for i in hand]) for hand in hands.tolist()])
+        t2 = time.perf_counter()
+        mismatches = int((values != expected).sum())
+        print(f"{size} cards: {mismatches} mismatches in {num_hands} hands, "
+              f"batch {(t1 - t0) / num_hands * 1e9:.0f} ns/hand, eval7 loop {(t2 - t1) / num_hands * 1e9:.0f} ns/hand")
+
+    # flops of every suit pattern, a turn and a river
+    spots = [(['5s', 'Jd'], ['Th', '4c', '7s']), (['7s', 'Kh'], ['3c', 'Jc', '7c']), (['Ah', 'Kh'], ['Qh', 'Th', '2c']),
+             (['Qs', '2d'], ['6d', 'Jh', 'Qh', 'Kc']), (['Jc', '7h'], ['2c', '9c', '3c', '4c']),
+             (['Qd', 'Jh'], ['Qs', 'Ts', '3h', 'Js', 'Tc'])]
+    rng = random.Random(2026)
+    for my_hand, board in spots:
+        t0 = time.perf_counter()
+        equities = combo_equities(my_hand, board)
+        elapsed = time.perf_counter() - t0
+        known = set(my_hand) | set(board)
+        combos = rng.sample([combo for combo in COMBOS if not known & set(combo)], 8)
+        error = max(abs(equities[COMBO_INDEX[combo]] - enumerated_equity(my_hand, combo, board)) for combo in combos)
+        assert error < 1e-9, (my_hand, board, error)
+        print(f"combo equities {' '.join(my_hand)} on {' '.join(board)}: max error {error:.1e} "
+              f"on {len(combos)} combos, {elapsed * 1e3:.1f} ms")
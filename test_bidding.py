@@ -0,0 +1,42 @@
+'''
+Checks pkbot.bidding.BidModel against simple bidders.
+
+Usage: python test_bidding.py
+'''
+import random
+
+from pkbot.bidding import BidModel, BidSketch
+
+BOARD = ['2c', '7d', 'Th']
+
+if __name__ == '__main__':
+    rng = random.Random(2026)
+
+    # a constant bidder seen across pots of every size is one exact bid, whatever the query pot
+    model = BidModel()
+    for _ in range(200):
+        model.observe(11, rng.randint(40, 140), BOARD)
+    for pot in (40, 100, 140):
+        atoms, bins = model.sketch(pot, BOARD).distribution(pot)
+        total = sum(p for _, p in atoms) + sum(p for _, _, p in bins)
+        assert abs(total - 1.) < 1e-9, (pot, atoms, bins)
+        choice = model.best_response(60., pot, BOARD)
+        assert choice.bid == 12 and abs(choice.win - 1.) < 1e-9, choice
+    # worth 10 cannot beat a bid of 11, but not when only half a paid bid is expected to be lost
+    assert model.best_response(5., 100, BOARD).win == 0.
+    assert model.best_response(5., 100, BOARD, bid_cost=0.5).bid == 12
+
+    # a mixed bidder with more distinct amounts than heavy hitters still sums to 1, also after saving
+    sketch = BidSketch()
+    for _ in range(2000):
+        pot = rng.randint(20, 800)
+        sketch.add(rng.choice([0, 5, 10, rng.randint(0, 2 * pot)]), pot)
+    restored = BidSketch()
+    restored.update(sketch.to_dict())
+    for current in (sketch, restored):
+        for pot in (30, 200, 700):
+            atoms, bins = current.distribution(pot)
+            assert all(p > 0 for _, _, p in bins), bins
+            total = sum(p for _, p in atoms) + sum(p for _, _, p in bins)
+            assert abs(total - 1.) < 1e-9, (pot, total)
+    print(f"constant bidder answered with {choice.bid}, win {choice.win:.3f}; mixed bidder sums to 1")
@@ -0,0 +1,23 @@
+'''
+Checks when pkbot.cache.EquityCache answers from the cache and when it samples more.
+
+Usage: python test_cache.py
+'''
+from pkbot.cache import EquityCache
+
+if __name__ == '__main__':
+    cache = EquityCache()
+
+    # a royal flush on the flop wins every sample: stderr 0, but only sampled
+    first = cache.equity(['As', 'Ks'], ['Qs', 'Js', 'Ts'], samples=50)
+    assert first.equity == 1. and first.stderr == 0. and first.samples == 50, first
+    topped = cache.equity(['Ah', 'Kh'], ['Qh', 'Jh', 'Th'], samples=200)
+    assert topped.samples == 200 and cache.misses == 2 and cache.hits == 0, (topped, cache.hits, cache.misses)
+    assert cache.equity(['Ad', 'Kd'], ['Qd', 'Jd', 'Td'], samples=100).samples == 200 and cache.hits == 1
+
+    # the river is enumerated exactly, so asking for more samples is still a hit
+    exact = cache.equity(['7c', '7d'], ['Ks', '9h', '2c', 'Jd', '3s'], samples=300)
+    again = cache.equity(['7h', '7s'], ['Kd', '9c', '2h', 'Js', '3d'], samples=100000)
+    assert again is exact and cache.hits == 2 and cache.misses == 3, (exact, again, cache.hits, cache.misses)
+    print(f"sampled all-win spot topped up to {topped.samples} samples, exact river spot "
+          f"({exact.samples} showdowns) reused: {cache.hits} hits, {cache.misses} misses")
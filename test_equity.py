@@ -0,0 +1,160 @@
+import os
+import random
+import threading
+import time
+
+import probability
+import bot1
+from pkbot.equity import equity, exact_equity, monte_carlo_equity, combination_count, METHODS
+from pkbot.pool import EquityPool
+from pkbot.river import RiverRanking
+
+SPOTS = [
+    (['As', 'Ks'], []),
+    (['As', 'Ks'], ['2h', '3h', '4h']),
+    (['7c', '7d'], ['Ks', '9h', '2c', 'Jd']),
+    (['Qh', 'Jh'], ['Th', '9c', '2h', '3s', 'Ad']),
+]
+SAMPLES = 300
+REPEATS = 20
+EXACT_SPOTS = [
+    (['Qh', 'Jh'], ['Th', '9c', '2h', '3s', 'Ad'], []),
+    (['Qh', 'Jh'], ['Th', '9c', '2h', '3s', 'Ad'], ['Ac']),
+    (['7c', '7d'], ['Ks', '9h', '2c', 'Jd'], ['Kd']),
+    (['As', 'Ks'], ['2h', '3h', '4h'], ['Ah']),
+]
+# spots small enough to compute the true equity exactly
+METHOD_SPOTS = [
+    (['As', 'Ks'], ['2h', '3h', '4h'], ['Ah']),
+    (['9c', '8c'], ['Tc', '7d', '2c'], ['Kc']),
+    (['7c', '7d'], ['Ks', '9h', '2c', 'Jd'], []),
+    (['Ah', 'Qd'], ['Qs', 'Jh', '5h', '5c'], []),
+]
+METHOD_REPEATS = 50
+
+
+def bench(name, func):
+    random.seed(0)
+    t0 = time.perf_counter()
+    results = [[func(hand, board) for _ in range(REPEATS)] for hand, board in SPOTS]
+    t1 = time.perf_counter()
+    per_call = (t1 - t0) * 1000 / (REPEATS * len(SPOTS))
+    means = ' '.join('{:6.3f}'.format(sum(r) / len(r)) for r in results)
+    print(f"{name:<32} {per_call:8.2f} ms/call   mean equity per spot: {means}")
+
+
+def bench_exact(hand, board, known):
+    t0 = time.perf_counter()
+    exact = exact_equity(hand, board, known)
+    t1 = time.perf_counter()
+    errors = [abs(monte_carlo_equity(hand, board, known, samples=SAMPLES).equity - exact.equity) for _ in range(REPEATS)]
+    t2 = time.perf_counter()
+    print(f"{' '.join(hand + board)} | {' '.join(known) or '--':<3} {combination_count(hand, board, known):6d} combos  "
+          f"exact {exact.equity:.4f} in {(t1 - t0) * 1000:7.2f} ms   "
+          f"MC{SAMPLES} {(t2 - t1) * 1000 / REPEATS:6.2f} ms, mean abs error {sum(errors) / REPEATS:.4f}")
+
+
+def bench_methods(samples):
+    '''
+    Root mean squared error and time per call of each sampling method, over METHOD_SPOTS.
+    '''
+    truths = [exact_equity(hand, board, known).equity for hand, board, known in METHOD_SPOTS]
+    for method in METHODS:
+        rng = random.Random(0)
+        squared = 0.
+        t0 = time.perf_counter()
+        for (hand, board, known), truth in zip(METHOD_SPOTS, truths):
+            for _ in range(METHOD_REPEATS):
+                estimate = monte_carlo_equity(hand, board, known, samples, rng=rng, method=method).equity
+                squared += (estimate - truth) ** 2
+        calls = METHOD_REPEATS * len(METHOD_SPOTS)
+        per_call = (time.perf_counter() - t0) * 1000 / calls
+        print(f"{method:<12} {samples:5d} samples {per_call:7.2f} ms/call   rms error {(squared / calls) ** 0.5:.4f}")
+
+
+def bench_river(hand, board):
+    '''
+    The river fast path against exact enumeration, for a uniform range.
+    '''
+    t0 = time.perf_counter()
+    ranking = RiverRanking(board)
+    t1 = time.perf_counter()
+    river_range = ranking.against()
+    t2 = time.perf_counter()
+    for _ in range(1000):
+        fast = river_range.equity(hand)
+    t3 = time.perf_counter()
+    exact = exact_equity(hand, board).equity
+    t4 = time.perf_counter()
+    print(f"{' '.join(hand + board)}  ranking {(t1 - t0) * 1000:.2f} ms, range {(t2 - t1) * 1e6:.0f} us, "
+          f"query {(t3 - t2) * 1000:.1f} us  equity {fast:.4f}  (exact_equity {exact:.4f} in {(t4 - t3) * 1000:.2f} ms)")
+
+
+def bench_pool(samples, workers=None):
+    '''
+    Time per call of a large query in-process and through an EquityPool, plus the pool's round trip cost.
+    '''
+    hand, board = ['As', 'Ks'], ['2h', '3h', '4h']
+    equity(hand, board, samples=samples)
+    t0 = time.perf_counter()
+    for _ in range(REPEATS):
+        equity(hand, board, samples=samples)
+    local = (time.perf_counter() - t0) * 1000 / REPEATS
+    with EquityPool(workers, min_samples=1) as pool:
+        shares = len(pool.connections) + 1
+        t0 = time.perf_counter()
+        for _ in range(REPEATS):
+            pool.equity(hand, board, samples=shares)
+        t1 = time.perf_counter()
+        for _ in range(REPEATS):
+            pool.equity(hand, board, samples=samples)
+        t2 = time.perf_counter()
+    print(f"EquityPool with {shares - 1} workers: round trip {(t1 - t0) * 1000 / REPEATS:.2f} ms, "
+          f"{samples} samples {(t2 - t1) * 1000 / REPEATS:.2f} ms/call against {local:.2f} ms in-process")
+
+
+def check_pool_restart(samples=20000):
+    '''
+    Kills an EquityPool worker, first while idle and then in the middle of a query, and checks
+    that queries still answer and that the worker is back for the next one.
+    '''
+    hand, board = ['As', 'Ks'], ['2h', '3h', '4h']
+    with EquityPool(1, min_samples=1) as pool:
+        pool.processes[0].kill()
+        pool.processes[0].join()
+        result = pool.equity(hand, board, samples=samples)
+        assert result.samples == samples and pool.restarts == 1 and pool.local == 1, (result, pool.restarts)
+        time.sleep(1.)  # the new worker starting
+        killer = threading.Timer(0.01, pool.processes[0].kill)
+        killer.start()
+        result = pool.equity(hand, board, samples=samples)
+        killer.join()
+        assert result.samples == samples // 2 and pool.restarts == 2 and pool.split == 1, (result, pool.restarts)
+        time.sleep(1.)
+        result = pool.equity(hand, board, samples=samples)
+        assert result.samples == samples and pool.split == 2, (result, pool.split)
+    print(f"EquityPool restarted {pool.restarts} dead workers and answered every query")
+
+
+if __name__ == '__main__':
+    player = bot1.Player()
+    print(f"{SAMPLES} samples per call, {REPEATS} calls per spot")
+    bench('probability.win_probability', lambda h, b: probability.win_probability_percent(h, b, SAMPLES) / 100)
+    bench('bot1.monte_carlo_win_pct', lambda h, b: player.monte_carlo_win_pct(h, b, simulations=SAMPLES) / 100)
+    bench('pkbot.equity', lambda h, b: equity(h, b, samples=SAMPLES).equity)
+    result = equity(['As', 'Ks'], ['2h', '3h', '4h'], samples=SAMPLES)
+    print(f"pkbot.equity stderr at {SAMPLES} samples: {result.stderr:.4f}")
+    print()
+    exact_equity(['2c', '2d'], ['3c', '3d', '3h', '3s', '4c'])  # warm up eval7
+    for hand, board, known in EXACT_SPOTS:
+        bench_exact(hand, board, known)
+    print()
+    for samples in (150, 300, 600):
+        bench_methods(samples)
+    print()
+    for hand, board, known in EXACT_SPOTS[:1]:
+        bench_river(hand, board)
+    bench_river(['7c', '7d'], ['Ks', '9h', '2c', 'Jd', '7h'])
+    print()
+    bench_pool(5000, workers=max(1, (os.cpu_count() or 1) - 1))
+    check_pool_restart()
@@ -0,0 +1,47 @@
+'''
+Checks pkbot.evaluator against eval7 and times both.
+
+Every one of the 2,598,960 five-card hands is compared, then random six- and
+seven-card hands.
+
+Usage: python test_evaluator.py [random hands]
+'''
+import itertools
+import random
+import sys
+import time
+
+import eval7
+
+from pkbot.equity import DECK
+from pkbot.evaluator import evaluate, tables
+
+if __name__ == '__main__':
+    num_hands = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    cards = {card: eval7.Card(card) for card in DECK}
+    tables()
+
+    t0 = time.perf_counter()
+    checked = mismatches = 0
+    for hand in itertools.combinations(DECK, 5):
+        if evaluate(hand) != eval7.evaluate([cards[card] for card in hand]):
+            mismatches += 1
+        checked += 1
+    print(f"5 cards: {mismatches} mismatches in all {checked} hands ({time.perf_counter() - t0:.1f}s)")
+
+    rng = random.Random(2026)
+    for size in (6, 7):
+        hands = [rng.sample(DECK, size) for _ in range(num_hands)]
+        mismatches = sum(evaluate(hand) != eval7.evaluate([cards[card] for card in hand]) for hand in hands)
+        print(f"{size} cards: {mismatches} mismatches in {num_hands} random hands")
+
+    hands = [rng.sample(DECK, 7) for _ in range(num_hands)]
+    converted = [[cards[card] for card in hand] for hand in hands]
+    t0 = time.perf_counter()
+    for hand in hands:
+        evaluate(hand)
+    t1 = time.perf_counter()
+    for hand in converted:
+        eval7.evaluate(hand)
+    t2 = time.perf_counter()
+    print(f"7 cards: pkbot.evaluator {num_hands / (t1 - t0):,.0f} hands/s, eval7 {num_hands / (t2 - t1):,.0f} hands/s")
@@ -0,0 +1,26 @@
+'''
+Checks that the pure-Python evaluator and probability.py work without eval7.
+
+eval7 is blocked before anything is imported, as if it were not installed.
+pkbot.equity must still import, and only fail once eval7 is actually used.
+
+Usage: python test_no_eval7.py
+'''
+import sys
+
+if __name__ == '__main__':
+    sys.modules['eval7'] = None
+
+    from pkbot.evaluator import evaluate, hand_type
+    import probability
+    import pkbot.equity
+
+    assert hand_type(evaluate(['As', 'Ks', 'Qs', 'Js', 'Ts', '2c', '3d'])) == 'Straight Flush'
+    assert probability.hand_rank(['Ah', 'Ad', 'Kc', 'Kd', '2s']) > probability.hand_rank(['Ah', 'Ad', 'Kc', 'Qd', '2s'])
+    try:
+        pkbot.equity.eval7.evaluate
+    except ImportError:
+        pass
+    else:
+        raise AssertionError('eval7 should be unavailable')
+    print('pkbot.evaluator, probability and pkbot.equity import without eval7')
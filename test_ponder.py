@@ -0,0 +1,63 @@
+'''
+Checks that example_bot's pondering is picked up by its later decisions.
+
+One hand is played through the Runner with a pause before every engine
+message, standing in for the opponent's thinking time. The flop decision
+must be a Ponderer hit on the auction's equities, and the turn and river
+decisions hits on the equities pondered for every next card. Once the hand
+is over, nothing may be left in the Ponderer.
+
+Usage: python test_ponder.py
+'''
+import time
+
+from example_bot import Player
+from pkbot.runner import Runner
+
+# we are the small blind, call, bid 7 against 5 and see the Qh, then the opponent checks every street
+HAND = [
+    'T30.000 P0 HAs,Kd',
+    'T29.900 C K B2c,7d,Th A5',
+    'T29.800 A7 P0 N4973,4975_7,5_Qh B2c,7d,Th K',
+    'T29.700 K B2c,7d,Th,3s K',
+    'T29.600 K B2c,7d,Th,3s,9s K',
+    'T29.500 K OQh,Jh D20',
+]
+
+
+class ThinkingFile():
+    '''
+    Feeds the Runner engine messages, each after a pause.
+    '''
+
+    def __init__(self, lines, pause):
+        self.lines = list(lines)
+        self.pause = pause
+        self.sent = []
+
+    def readline(self):
+        time.sleep(self.pause)
+        return self.lines.pop(0) + '\n' if self.lines else 'Q\n'
+
+    def write(self, text):
+        self.sent.append(text.strip())
+
+    def flush(self):
+        pass
+
+
+if __name__ == '__main__':
+    bot = Player()
+    # (kind, board size) of every lookup, hit or not
+    looked_up = []
+    get = bot.ponderer.get
+    bot.ponderer.get = lambda key, *args: (looked_up.append((key[0], len(key[2]))), get(key, *args))[1]
+    socketfile = ThinkingFile(HAND, pause=0.5)
+    Runner(bot, socketfile).run()
+    print(f"replies {' '.join(socketfile.sent)}; lookups {looked_up}; "
+          f"ponderer {bot.ponderer.hits} hits, {bot.ponderer.misses} misses")
+    assert looked_up == [('equity', 0), ('flop', 3), ('equity', 4), ('equity', 5)], looked_up
+    # everything after the pre-flop decision was ready when it was asked for
+    assert bot.ponderer.misses == 1 and bot.ponderer.hits == 3, (bot.ponderer.hits, bot.ponderer.misses)
+    # and nothing from the finished hand is left queued or cached
+    assert not bot.ponderer.pending and not bot.ponderer.results, (len(bot.ponderer.pending), len(bot.ponderer.results))
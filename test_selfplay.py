@@ -0,0 +1,27 @@
+'''
+Checks that a self-play shard is reproduced exactly from its seed, pondering bot included.
+
+Usage: python test_selfplay.py
+'''
+import os
+import tempfile
+
+import numpy as np
+
+from selfplay import play_shard
+
+if __name__ == '__main__':
+    here = os.path.dirname(os.path.abspath(__file__))
+    bots = [os.path.join(here, 'bot4.py'), os.path.join(here, 'example_bot.py')]
+    shards = []
+    with tempfile.TemporaryDirectory() as out:
+        for run in range(2):
+            os.makedirs(os.path.join(out, str(run)))
+            play_shard((0, bots, 1, 60, 2026, os.path.join(out, str(run)), None))
+            with np.load(os.path.join(out, str(run), 'shard-00000.npz')) as shard:
+                shards.append({column: shard[column] for column in shard.files})
+    first, second = shards
+    assert first.keys() == second.keys()
+    for column in first:
+        assert np.array_equal(first[column], second[column]), column
+    print(f"two runs of one shard: {len(first['action'])} identical decisions, payoff sum {first['payoff'].sum()}")
@@ -0,0 +1,77 @@
+'''
+Checks that a decision overrunning its deadline neither holds up the engine
+nor runs alongside the bot's hand callbacks.
+
+Three hands are played through the Runner with a 50 ms decision deadline.
+The first get_move sleeps for 1.5 s without looking at its Deadline, and
+the engine pauses for 1.6 s before the third hand.
+
+Usage: python test_watchdog.py
+'''
+import time
+
+from pkbot.actions import ActionCall, ActionCheck
+from pkbot.base import BaseBot
+from pkbot.runner import Runner
+
+HAND = [
+    'T30.000 P0 HAs,Kd',
+    'T29.900 C K B2c,7d,Th A5',
+    'T29.800 A7 P0 N4973,4975_7,5_Qh B2c,7d,Th K',
+    'T29.700 K B2c,7d,Th,3s K',
+    'T29.600 K B2c,7d,Th,3s,9s K',
+    'T29.500 K OQh,Jh D20',
+]
+
+
+class LineFile():
+    def __init__(self, lines):
+        self.lines = list(lines)
+
+    def readline(self):
+        if self.lines and self.lines[0] is None:
+            self.lines.pop(0)
+            time.sleep(1.6)
+        return self.lines.pop(0) + '\n' if self.lines else 'Q\n'
+
+    def write(self, text):
+        pass
+
+    def flush(self):
+        pass
+
+
+class Stalling(BaseBot):
+    def __init__(self):
+        self.events = []
+        self.stalled = False
+
+    def on_hand_start(self, game_info, current_state):
+        self.events.append('start')
+
+    def on_hand_end(self, game_info, current_state):
+        self.events.append('end')
+
+    def get_move(self, game_info, current_state):
+        self.events.append('move')
+        if not self.stalled:
+            self.stalled = True
+            time.sleep(1.5)
+        self.events.append('moved')
+        return ActionCheck() if current_state.can_act(ActionCheck) else ActionCall()
+
+
+if __name__ == '__main__':
+    bot = Stalling()
+    t0 = time.perf_counter()
+    Runner(bot, LineFile(HAND + HAND + [None] + HAND), decision_deadline=0.05).run()
+    elapsed = time.perf_counter() - t0
+    print(f"played in {elapsed:.2f}s: {' '.join(bot.events)}")
+    # hands one and two were answered without waiting out the stall, so the pause
+    # began long before it ended; waiting would have taken at least 1.5 + 1.6 s
+    assert elapsed < 2.8, elapsed
+    # callbacks and decisions never interleave, and every hand's callbacks ran, in order
+    assert bot.events[:3] == ['start', 'move', 'moved'], bot.events
+    assert [event for event in bot.events if event in ('start', 'end')] == ['start', 'end'] * 3, bot.events
+    for before, after in zip(bot.events, bot.events[1:]):
+        assert before != 'move' or after == 'moved', bot.events
@@ -0,0 +1,186 @@
+'''
+Tunes a bot's PARAMS with duplicate matches and successive halving.
+
+Candidates are the bot's defaults plus random draws from its search space in
+SPACES. Every round, each surviving candidate plays the same new batch of
+duplicate match pairs against the opponent: the same seeded cards are played
+twice with the seats swapped, which cancels most of the luck of the deal.
+Matches run in-process (see selfplay.py) across a process pool. After each
+round the worse half of the candidates, ranked by mean chips won per hand over
+all their pairs, is dropped and the survivors get twice as many new pairs.
+Matches run without a time bank, so results do not depend on machine load,
+and pondering is off (see selfplay.py), so both halves of a pair see the
+same decisions. Speed is enforced separately: a candidate whose decisions
+take longer per hand on average than --max-time (GAME_CLOCK / NUM_ROUNDS by
+default), or than the defaults if those are slower, is dropped outright.
+The winner is written to the bot's parameter file (see pkbot.params), which
+the bot loads on start.
+
+Usage: python tune.py BOT_FILE [--opponent BOT_FILE] [--candidates N] [--pairs N]
+                      [--hands N] [--workers N] [--seed S] [--out PATH] [--max-time SECONDS]
+'''
+import argparse
+import contextlib
+import functools
+import math
+import multiprocessing
+import os
+import random
+import time
+
+import numpy as np
+
+from engine import GAME_CLOCK, NUM_ROUNDS
+from pkbot.params import params_path, save_params
+from selfplay import load_bot, play_match
+
+# search ranges (low, high) per bot; integer defaults are searched as integers
+SPACES = {
+    'bot4.py': {
+        'draw_bid': (0., 0.5),
+        'value_bid': (0., 0.4),
+        'base_bid': (0., 0.15),
+        'preflop_raise': (0.5, 3.),
+        'overpair_wet_raise': (0.5, 3.),
+        'overpair_raise': (0.5, 3.),
+        'top_pair_raise': (0.3, 2.),
+        'semi_bluff_raise': (0.3, 2.),
+        'bluff_raise': (0.3, 2.),
+        'preflop_call': (0., 1.),
+        'mid_pair_call': (0., 1.),
+        'draw_call': (0., 1.),
+        'semi_bluff_freq': (0., 1.),
+        'bluff_freq': (0., 0.8),
+    },
+    'bot1.py': {
+        'simulations': (10, 200),
+        'auction_simulations': (10, 150),
+        'auction_low': (20, 50),
+        'auction_high': (55, 85),
+        'auction_bid': (0., 0.4),
+        'auction_small_bid': (0., 0.1),
+        'revealed_raise': (45, 80),
+        'revealed_fold': (5, 40),
+        'raise_threshold': (55, 90),
+        'fold_threshold': (20, 55),
+        'raise_multiple': (1., 4.),
+        'max_raises': (1, 4),
+    },
+}
+
+_bots = {}
+
+
+def bot_module(path):
+    '''
+    A bot file's module, imported once per worker.
+    '''
+    if path not in _bots:
+        _bots[path] = load_bot(path, len(_bots))
+    return _bots[path]
+
+
+def sample(defaults, space, rng):
+    '''
+    A random candidate: defaults with every parameter in space drawn uniformly from its range.
+    '''
+    params = dict(defaults)
+    for name, (low, high) in space.items():
+        if isinstance(defaults[name], int):
+            params[name] = rng.randint(low, high)
+        else:
+            params[name] = round(rng.uniform(low, high), 4)
+    return params
+
+
+def play_pair(args):
+    '''
+    Plays one duplicate pair; returns (candidate, chips won per hand, seconds spent per hand)
+    by the candidate.
+    '''
+    candidate, params, bot_file, opponent_file, hands, seed = args
+    bot = bot_module(bot_file)
+    bots = [functools.partial(bot.Player, params=params)]
+    if opponent_file == bot_file:
+        bots.append(functools.partial(bot.Player, params=dict(bot.PARAMS)))
+    else:
+        bots.append(bot_module(opponent_file).Player)
+    names = ('candidate', 'opponent')
+    won = seconds = 0
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for order in ((0, 1), (1, 0)):
+            random.seed(seed)
+            np.random.seed(seed % 2 ** 32)
+            results = play_match([bots[i] for i in order], [names[i] for i in order],
+                                 hands, random.Random(seed), None, [])
+            bankroll, spent = results[order.index(0)]
+            won += bankroll
+            seconds += spent
+    return candidate, won / (2 * hands), seconds / (2 * hands)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('bot', help='Bot file with a PARAMS dict, e.g. bot4.py')
+    parser.add_argument('--opponent', type=str, default=None, help='Bot file to play against; defaults to the bot itself')
+    parser.add_argument('--candidates', type=int, default=32)
+    parser.add_argument('--pairs', type=int, default=4, help='Duplicate pairs per candidate in the first round')
+    parser.add_argument('--hands', type=int, default=200, help='Hands per match')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes')
+    parser.add_argument('--seed', type=int, default=2026)
+    parser.add_argument('--out', type=str, default=None, help='Parameter file to write; defaults to the bot\'s own')
+    parser.add_argument('--max-time', type=float, default=GAME_CLOCK / NUM_ROUNDS,
+                        help='Most seconds per hand a candidate may spend deciding, on average')
+    args = parser.parse_args()
+
+    bot_file = os.path.abspath(args.bot)
+    opponent_file = os.path.abspath(args.opponent) if args.opponent else bot_file
+    defaults = bot_module(bot_file).PARAMS
+    space = SPACES.get(os.path.basename(bot_file), {})
+    rng = random.Random(args.seed)
+    candidates = [dict(defaults)] + [sample(defaults, space, rng) for _ in range(args.candidates - 1)]
+    scores = [[] for _ in candidates]
+    times = [[] for _ in candidates]
+    alive = list(range(len(candidates)))
+    pairs = args.pairs
+    limit = None
+    next_seed = args.seed * 1000003
+
+    t0 = time.perf_counter()
+    hands_played = 0
+    with multiprocessing.Pool(args.workers) as pool:
+        while len(alive) > 1:
+            # every survivor plays the same new deals
+            seeds = range(next_seed, next_seed + pairs)
+            next_seed += pairs
+            jobs = [(c, candidates[c], bot_file, opponent_file, args.hands, seed) for c in alive for seed in seeds]
+            for candidate, won, seconds in pool.imap_unordered(play_pair, jobs):
+                scores[candidate].append(won)
+                times[candidate].append(seconds)
+            hands_played += 2 * args.hands * len(jobs)
+            if limit is None:
+                # candidate 0 is the defaults; a bot already slower than the limit may not get slower still
+                limit = max(args.max_time, np.mean(times[0]))
+                if limit > args.max_time:
+                    print(f"The defaults spend {limit:.3f}s per hand deciding, more than {args.max_time:.3f}s; "
+                          f"only candidates at most that slow are kept", flush=True)
+            slow = [c for c in alive if c != 0 and np.mean(times[c]) > limit]
+            alive = [c for c in alive if c not in slow]
+            alive.sort(key=lambda c: np.mean(scores[c]), reverse=True)
+            best = alive[0]
+            elapsed = time.perf_counter() - t0
+            print(f"{len(alive)} candidates, {len(scores[best])} pairs each: best #{best} "
+                  f"{np.mean(scores[best]):+.2f} +- {np.std(scores[best]) / math.sqrt(len(scores[best])):.2f} chips/hand, "
+                  f"{np.mean(times[best]) * 1e3:.1f} ms/hand, "
+                  f"defaults {np.mean(scores[0]) if 0 in alive else float('nan'):+.2f}, "
+                  f"{len(slow)} too slow, {hands_played / elapsed:.0f} hands/s", flush=True)
+            alive = alive[:math.ceil(len(alive) / 2)]
+            pairs *= 2
+
+    best = candidates[alive[0]]
+    out = args.out or params_path(bot_file)
+    save_params(best, out)
+    print(f"Wrote {out} in {time.perf_counter() - t0:.1f}s")
+    for name in sorted(best):
+        if best[name] != defaults[name]:
+            print(f"  {name}: {defaults[name]} -> {best[name]}")